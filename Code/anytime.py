@@ -0,0 +1,126 @@
+# header files
+import time
+from heapq import heappush, heappop, heapify
+from math import sqrt
+from searchresult import SearchResult
+
+
+# anytime repairing a-star (ARA*): a weighted search with the planner's weight finds a bounded-suboptimal path fast,
+# then the weight is lowered by weightStep and the search resumes from the states it already holds, until the
+# weight reaches 1 or the planner's timeLimit runs out; returns the best path found and records its bound in stats,
+# as a result with reason 'deadline' when the time ran out first so that its path is never taken as final
+def arastar_search(planner, start, goal, stepSize):
+    began = time.time()
+    deadline = None if planner.timeLimit is None else began + planner.timeLimit
+    planner.Reset()
+    planner.goal = goal
+    planner.stepSize = stepSize
+    (_, moves, table) = planner.Moves(stepSize)
+    (stamps, costs, parents, rounding) = (planner._stamp, planner._costToCome, planner._path, planner._rounding)
+    generation = planner.generation
+    numCols = planner.numCols
+    (goalRow, goalCol) = (goal[0] - 1, goal[1] - 1)
+    startIndex = planner.Index(start[0], start[1])
+    goalIndex = planner.Index(goal[0], goal[1])
+    heuristic = planner.Heuristic(goal, stepSize)
+
+    # cost-to-go, the planner's landmark bound when configured, euclidean otherwise
+    def cost_to_go(index):
+        if(heuristic is not None):
+            return heuristic(index)
+        (row, col) = divmod(index, numCols)
+        return sqrt((((goalRow - row) / stepSize) ** 2) + (((goalCol - col) / stepSize) ** 2))
+
+    # g-value of a seen cell, inf otherwise
+    def cost_to_come(index):
+        return costs[index] if stamps[index] >= generation else float('inf')
+
+    stamps[startIndex] = generation
+    costs[startIndex] = 0
+    parents[startIndex] = -1
+    epsilon = max(planner.weight, 1.0)
+
+    # an infinite landmark bound proves the goal unreachable, such cells are never queued
+    startCostToGo = cost_to_go(startIndex)
+    queue = [(epsilon * startCostToGo, 0.0, startIndex)] if startCostToGo != float('inf') else []
+    openSet = set([startIndex]) if len(queue) > 0 else set()
+    inconsistent = set()
+    exploredStates = []
+    solutions = []
+    (pushes, stale, expansions) = (1, 0, 0)
+    timedOut = False
+
+    while(True):
+        # improve the path with the current weight, cells improved after being closed wait in the inconsistent set
+        closedSet = set()
+        while(len(queue) > 0):
+            (key, costToCome, currentIndex) = queue[0]
+            rounding[0] = costToCome
+            if(currentIndex not in openSet or rounding[0] != costs[currentIndex]):
+                heappop(queue)
+                stale = stale + 1
+                continue
+            if(key >= cost_to_come(goalIndex)):
+                break
+            if(deadline is not None and (expansions & 255) == 0 and time.time() > deadline):
+                timedOut = True
+                break
+            heappop(queue)
+            openSet.discard(currentIndex)
+            closedSet.add(currentIndex)
+            exploredStates.append(planner.Cell(currentIndex))
+            expansions = expansions + 1
+
+            for (offset, weight) in table[moves[currentIndex]]:
+                index = currentIndex + offset
+                new_cost_to_come = costToCome + weight
+                rounding[0] = new_cost_to_come
+                if(stamps[index] < generation or costs[index] > rounding[0]):
+                    stamps[index] = generation
+                    costs[index] = new_cost_to_come
+                    parents[index] = currentIndex
+                    if(index in closedSet):
+                        inconsistent.add(index)
+                        continue
+                    new_cost_to_go = cost_to_go(index)
+                    if(new_cost_to_go != float('inf')):
+                        openSet.add(index)
+                        heappush(queue, (new_cost_to_come + epsilon * new_cost_to_go, new_cost_to_come, index))
+                        pushes = pushes + 1
+
+        # publish the path of this round together with its suboptimality bound
+        goalCost = cost_to_come(goalIndex)
+        if(goalCost != float('inf') and not timedOut):
+            lowest = min([costs[index] + cost_to_go(index) for index in openSet | inconsistent] + [goalCost])
+            solutions.append((min(epsilon, goalCost / lowest) if lowest > 0 else 1.0, float(goalCost), time.time() - began))
+        if(timedOut or epsilon <= 1.0 or len(queue) == 0 and len(inconsistent) == 0):
+            break
+        if(deadline is not None and time.time() > deadline):
+            timedOut = True
+            break
+
+        # lower the weight and resume from the open and inconsistent cells with their keys recomputed
+        epsilon = max(1.0, epsilon - planner.weightStep)
+        openSet = openSet | inconsistent
+        inconsistent = set()
+        queue = [(costs[index] + epsilon * cost_to_go(index), float(costs[index]), index) for index in openSet]
+        heapify(queue)
+
+    planner.stats = {'expansions': expansions, 'pushes': pushes, 'stale': stale, 'open': len(openSet),
+                     'epsilon': solutions[-1][0] if len(solutions) > 0 else float('inf'), 'solutions': solutions}
+
+    # return if no path was found in time
+    if(stamps[goalIndex] < generation):
+        return SearchResult(exploredStates, [], float('inf'), 'deadline' if timedOut else 'unreachable', expansions)
+
+    # backtrack path, summing the step costs in path order
+    backtrackStates = []
+    index = goalIndex
+    while(index != -1):
+        backtrackStates.append(planner.Cell(index))
+        index = parents[index]
+    backtrackStates = list(reversed(backtrackStates))
+    distance = 0.0
+    for (previous, current) in zip(backtrackStates, backtrackStates[1:]):
+        distance = distance + planner.actionCost[0 if previous[0] == current[0] or previous[1] == current[1] else 4]
+    return SearchResult(exploredStates, backtrackStates, distance, 'deadline' if timedOut else 'goal', expansions)
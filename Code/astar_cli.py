@@ -0,0 +1,164 @@
+# header files
+import argparse
+import csv
+import json
+import sys
+import time
+from utils import Planner, HEURISTICS, SEARCH_MODES, render_video
+from openlist import OPEN_LISTS
+from maps import default_map
+from mapcache import MapCache
+
+
+# records of a .jsonl or .csv file ('-' reads json lines from stdin) as (record, error) pairs, error being a
+# message for a json line that cannot be decoded; see parse_query for the fields
+def read_queries(path):
+    if(path.endswith('.csv')):
+        with open(path, newline = '') as stream:
+            for record in csv.DictReader(stream):
+                yield (dict((key, value) for (key, value) in record.items() if value not in (None, '')), None)
+        return
+    stream = sys.stdin if path == '-' else open(path)
+    try:
+        for line in stream:
+            if(line.strip()):
+                try:
+                    yield (json.loads(line), None)
+                except ValueError as problem:
+                    yield (None, "malformed JSON: " + str(problem))
+    finally:
+        if(stream is not sys.stdin):
+            stream.close()
+
+
+# query of a record, a dict with start and goal as (x, y) (csv files name the coordinates start_x, start_y, goal_x
+# and goal_y) and optional radius, clearance, step and id, the command line giving the defaults; raises ValueError
+# naming the problem for a malformed record
+def parse_query(record, args):
+    if(not isinstance(record, dict)):
+        raise ValueError("a query must be an object")
+    query = dict(record)
+    try:
+        for name in ('start', 'goal'):
+            if(name + '_x' in query or name + '_y' in query):
+                query[name] = (query.pop(name + '_x'), query.pop(name + '_y'))
+            if(name not in query):
+                raise ValueError("missing " + name)
+            if(not isinstance(query[name], (list, tuple)) or len(query[name]) != 2):
+                raise ValueError(name + " must be a pair of coordinates")
+            query[name] = (int(query[name][0]), int(query[name][1]))
+        query['radius'] = int(query.get('radius', args.radius))
+        query['clearance'] = int(query.get('clearance', args.clearance))
+        query['step'] = int(query.get('step', args.step))
+    except KeyError as problem:
+        raise ValueError("missing " + str(problem.args[0]))
+    except TypeError as problem:
+        raise ValueError(str(problem))
+    if(query['radius'] < 0 or query['clearance'] < 0 or query['step'] < 1):
+        raise ValueError("radius and clearance must be at least 0 and step at least 1")
+    return query
+
+
+# one output record, coordinates are (x, y) like the input and a missing path has distance null
+def result_record(index, query, result, elapsed, withPath):
+    (_, backtrackStates, distance) = result
+    record = {'index': index, 'id': query.get('id'), 'start': list(query['start']), 'goal': list(query['goal']),
+              'radius': query['radius'], 'clearance': query['clearance'], 'step': query['step'],
+              'distance': distance if distance != float('inf') else None, 'expansions': result.expansions,
+              'reason': result.reason, 'time': elapsed}
+    if(withPath):
+        record['path'] = [[int(col), int(row)] for (row, col) in backtrackStates]
+    return record
+
+
+# plan queries from the command line or a file and write one json object per line to stdout
+def main():
+    parser = argparse.ArgumentParser(description = "Plan A* queries without prompts and print one JSON result per line.")
+    parser.add_argument("--start", type = int, nargs = 2, metavar = ("X", "Y"), help = "start node of a single query")
+    parser.add_argument("--goal", type = int, nargs = 2, metavar = ("X", "Y"), help = "goal node of a single query")
+    parser.add_argument("--queries", help = "a .jsonl or .csv file of queries, '-' reads JSON lines from stdin")
+    parser.add_argument("--radius", type = int, default = 5, help = "robot radius, the default for file queries")
+    parser.add_argument("--clearance", type = int, default = 5, help = "robot clearance, the default for file queries")
+    parser.add_argument("--step", type = int, default = 1, help = "step size, the default for file queries")
+    parser.add_argument("--mode", default = 'astar', choices = sorted(SEARCH_MODES), help = "search mode")
+    parser.add_argument("--heuristic", default = 'euclidean', choices = HEURISTICS, help = "heuristic of the astar mode")
+    parser.add_argument("--open-list", default = 'heap', choices = sorted(OPEN_LISTS), help = "open list engine")
+    parser.add_argument("--weight", type = float, default = 1.0, help = "heuristic weight")
+    parser.add_argument("--max-expansions", type = int, help = "stop a query after this many expansions")
+    parser.add_argument("--time-limit", type = float, help = "stop a query after this many seconds")
+    parser.add_argument("--workers", type = int, default = 1, help = "worker processes per footprint, results come in completion order")
+    parser.add_argument("--cache-dir", help = "directory of the on-disk map cache")
+    parser.add_argument("--no-path", action = "store_true", help = "leave the path out of the results")
+    parser.add_argument("--render", metavar = "VIDEO", help = "render a single query to a video file")
+    args = parser.parse_args()
+
+    # records of the queries
+    if(args.queries is not None):
+        records = list(read_queries(args.queries))
+    elif(args.start is not None and args.goal is not None):
+        records = [({'start': args.start, 'goal': args.goal}, None)]
+    else:
+        parser.error("give --start and --goal, or --queries")
+    if(args.render is not None and (len(records) != 1 or args.workers > 1)):
+        parser.error("--render needs a single query and a single worker")
+    if(args.max_expansions is not None and (args.mode != 'astar' or args.workers > 1)):
+        parser.error("--max-expansions needs the astar mode and a single worker")
+    if(args.time_limit is not None and args.mode not in ('astar', 'arastar')):
+        parser.error("--time-limit needs the astar or arastar mode")
+
+    worldMap = default_map()
+    if(args.cache_dir is not None):
+        worldMap.cache = MapCache(args.cache_dir)
+    options = {'mode': args.mode, 'heuristic': args.heuristic, 'openList': args.open_list, 'weight': args.weight,
+               'timeLimit': args.time_limit, 'record': 'none' if args.render is None else 'list'}
+
+    # queries with the command line defaults filled in, malformed records are reported and skipped
+    out = sys.stdout
+    queries = {}
+    for (index, (record, error)) in enumerate(records):
+        if(error is None):
+            try:
+                queries[index] = parse_query(record, args)
+                continue
+            except ValueError as problem:
+                error = "malformed query: " + str(problem)
+        out.write(json.dumps({'index': index, 'id': record.get('id') if isinstance(record, dict) else None, 'error': error}) + "\n")
+
+    # group the queries by footprint, every footprint gets its own planner
+    groups = {}
+    for (index, query) in queries.items():
+        groups.setdefault((query['clearance'], query['radius']), []).append(index)
+
+    for ((clearance, radius), indices) in groups.items():
+        planner = Planner(clearance, radius, worldMap = worldMap, **options)
+
+        # queries whose start or goal cannot be used are reported without planning
+        valid = []
+        for index in indices:
+            query = queries[index]
+            problems = [name + " node is outside the map or an obstacle" for name in ('start', 'goal')
+                        if not planner.IsValid(query[name][1], query[name][0]) or planner.IsObstacle(query[name][1], query[name][0])]
+            if(len(problems) > 0):
+                out.write(json.dumps({'index': index, 'id': query.get('id'), 'start': list(query['start']), 'goal': list(query['goal']), 'error': "; ".join(problems)}) + "\n")
+            else:
+                valid.append(index)
+
+        # plan, a worker pool reports no per-query time
+        plans = [((queries[index]['start'][1], queries[index]['start'][0]), (queries[index]['goal'][1], queries[index]['goal'][0]), queries[index]['step']) for index in valid]
+        if(args.workers > 1):
+            for (position, result) in planner.plan_many(plans, args.workers):
+                index = valid[position]
+                out.write(json.dumps(result_record(index, queries[index], result, None, not args.no_path)) + "\n")
+            continue
+        for (index, plan) in zip(valid, plans):
+            began = time.time()
+            result = planner.plan(*plan, maxExpansions = args.max_expansions)
+            elapsed = time.time() - began
+            out.write(json.dumps(result_record(index, queries[index], result, elapsed, not args.no_path)) + "\n")
+            out.flush()
+            if(args.render is not None):
+                render_video(planner, result[0], result[1], args.render, headless = True)
+
+
+if __name__ == "__main__":
+    main()
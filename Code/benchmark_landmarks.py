@@ -0,0 +1,47 @@
+# header files
+import argparse
+import random
+import time
+from utils import Planner
+
+
+# compare a-star expansions and run time with the euclidean and the landmark heuristic on random queries
+def main():
+    parser = argparse.ArgumentParser(description = "Benchmark the landmark (ALT) heuristic against the euclidean one.")
+    parser.add_argument("--queries", type = int, default = 200, help = "number of random start/goal pairs")
+    parser.add_argument("--landmarks", type = int, default = 8, help = "number of landmarks")
+    parser.add_argument("--radius", type = int, default = 5, help = "robot radius")
+    parser.add_argument("--clearance", type = int, default = 5, help = "robot clearance")
+    parser.add_argument("--seed", type = int, default = 0, help = "random seed for the queries")
+    args = parser.parse_args()
+
+    euclidean = Planner(args.clearance, args.radius)
+    landmarks = Planner(args.clearance, args.radius, heuristic = 'landmarks', landmarkCount = args.landmarks)
+    start = time.time()
+    landmarks.LoadLandmarks()
+    print("Landmark tables built in %.2f s" % (time.time() - start))
+
+    # random queries between free cells
+    rng = random.Random(args.seed)
+    (rows, cols) = euclidean.free.nonzero()
+    cells = list(zip(rows + 1, cols + 1))
+    queries = [(rng.choice(cells), rng.choice(cells)) for _ in range(args.queries)]
+
+    totals = {}
+    for (name, planner) in (("euclidean", euclidean), ("landmarks", landmarks)):
+        (expansions, elapsed) = (0, 0.0)
+        for (startCell, goalCell) in queries:
+            begin = time.time()
+            planner.plan(startCell, goalCell, 1)
+            elapsed = elapsed + time.time() - begin
+            expansions = expansions + planner.stats['expansions']
+        totals[name] = (expansions, elapsed)
+
+    print("%-10s %14s %10s" % ("heuristic", "expansions", "time (s)"))
+    for (name, (expansions, elapsed)) in totals.items():
+        print("%-10s %14d %10.2f" % (name, expansions, elapsed))
+    print("expansion ratio: %.2f" % (totals["euclidean"][0] / max(totals["landmarks"][0], 1)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+# header files
+import numpy as np
+
+
+# search state for the goal side, allocated on first use and reset by the planner's generation counter
+def reverse_state(planner):
+    if(planner.reverseState is None):
+        costToCome = np.empty(planner.numCells, dtype=np.float32)
+        path = np.empty(planner.numCells, dtype=np.int32)
+        stamp = np.zeros(planner.numCells, dtype=np.uint32)
+        planner.stampArrays.append(stamp)
+        planner.reverseState = (memoryview(stamp), memoryview(costToCome), memoryview(path))
+    return planner.reverseState
+
+
+# bidirectional a-star, explored states are (row, col, side) with side 0 for the start side and 1 for the goal side
+def bidirectional_search(planner, start, goal, stepSize):
+    planner.Reset()
+    planner.goal = goal
+    planner.stepSize = stepSize
+    numCols = planner.numCols
+    (_, moves, table) = planner.Moves(stepSize)
+    (straight, diagonal) = (planner.actionCost[0], planner.actionCost[4])
+    startIndex = planner.Index(start[0], start[1])
+    goalIndex = planner.Index(goal[0], goal[1])
+    rounding = planner._rounding
+    (generation, closed) = (planner.generation, planner.generation + 1)
+    planner.stats = {'expansions': 0, 'pushes': 0, 'stale': 0, 'open': 0}
+
+    # trivial queries: the goal is the start, or it can never be entered from the lattice
+    if(startIndex == goalIndex):
+        return ([(start[0], start[1], 0)], [start], 0.0)
+    if(not planner.free[goal[0] - 1, goal[1] - 1] or (goal[0] - start[0]) % stepSize != 0 or (goal[1] - start[1]) % stepSize != 0):
+        return ([], [], float('inf'))
+
+    # octile distance in steps towards a target, consistent with the 1.414 diagonal cost as the termination test needs
+    def octile(targetRow, targetCol):
+        def heuristic(index):
+            (row, col) = divmod(index, numCols)
+            (dRow, dCol) = (abs(targetRow - row) / stepSize, abs(targetCol - col) / stepSize)
+            return diagonal * min(dRow, dCol) + straight * abs(dRow - dCol)
+        return heuristic
+
+    # one search per side: stamps, costs, parents, open list, heuristic towards the other end
+    forward = (planner._stamp, planner._costToCome, planner._path, planner.NewOpenList(), octile(goal[0] - 1, goal[1] - 1))
+    backward = reverse_state(planner) + (planner.NewOpenList(), octile(start[0] - 1, start[1] - 1))
+    for ((stamps, costs, parents, queue, heuristic), index) in ((forward, startIndex), (backward, goalIndex)):
+        stamps[index] = generation
+        costs[index] = 0
+        parents[index] = -1
+        queue.push((heuristic(index), 0.0, index))
+
+    # run both searches, always advancing the side with the smaller open list, until the cheaper side's
+    # smallest f-value reaches the best meeting cost found so far
+    exploredStates = []
+    (pushes, stale) = (2, 0)
+    (bestCost, meetIndex) = (float('inf'), -1)
+    while(len(forward[3]) > 0 and len(backward[3]) > 0):
+        side = 0 if len(forward[3]) <= len(backward[3]) else 1
+        (stamps, costs, parents, queue, heuristic) = forward if side == 0 else backward
+        (otherStamps, otherCosts) = (backward[0], backward[1]) if side == 0 else (forward[0], forward[1])
+
+        distance, costToCome, currentIndex = queue.pop()
+        if(stamps[currentIndex] == closed):
+            stale = stale + 1
+            continue
+        if(distance >= bestCost):
+            break
+        stamps[currentIndex] = closed
+        (row, col) = divmod(currentIndex, numCols)
+        exploredStates.append((row + 1, col + 1, side))
+
+        # moves are symmetric, so the goal side walks the same free-cell table backwards
+        for (offset, weight) in table[moves[currentIndex]]:
+            index = currentIndex + offset
+            stamp = stamps[index]
+            if(stamp == closed):
+                continue
+            new_cost_to_come = costToCome + weight
+            rounding[0] = new_cost_to_come
+            if(stamp != generation or costs[index] > rounding[0]):
+                stamps[index] = generation
+                costs[index] = new_cost_to_come
+                parents[index] = currentIndex
+                queue.push((new_cost_to_come + heuristic(index), new_cost_to_come, index))
+                pushes = pushes + 1
+
+            # the other side has reached this cell, so the two half paths join into a full one
+            if(otherStamps[index] >= generation and new_cost_to_come + otherCosts[index] < bestCost):
+                bestCost = new_cost_to_come + otherCosts[index]
+                meetIndex = index
+
+    planner.stats = {'expansions': len(exploredStates), 'pushes': pushes, 'stale': stale, 'open': len(forward[3]) + len(backward[3])}
+
+    # return if no optimal path
+    if(meetIndex == -1):
+        return (exploredStates, [], float('inf'))
+
+    # backtrack path, the start side's parents lead back to the start and the goal side's on to the goal
+    backtrackStates = []
+    index = meetIndex
+    while(index != -1):
+        backtrackStates.append(planner.Cell(index))
+        index = forward[2][index]
+    backtrackStates = list(reversed(backtrackStates))
+    index = backward[2][meetIndex]
+    while(index != -1):
+        backtrackStates.append(planner.Cell(index))
+        index = backward[2][index]
+
+    # sum the step costs in path order so the distance matches the one a-star accumulates
+    distance = 0.0
+    for (previous, current) in zip(backtrackStates, backtrackStates[1:]):
+        distance = distance + (straight if previous[0] == current[0] or previous[1] == current[1] else diagonal)
+    return (exploredStates, backtrackStates, distance)
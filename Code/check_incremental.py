@@ -0,0 +1,59 @@
+# header files
+import argparse
+import random
+import sys
+from utils import Planner
+from incremental import DStarLite
+
+
+# tolerance on path costs, sums of the same steps in another order differ by rounding
+COST_TOLERANCE = 1e-6
+
+
+# repair d-star lite through rounds of random cell edits and compare every path with a fresh a-star search,
+# exits with status 1 on the first query whose repaired path costs more (or less) than the fresh one
+def main():
+    parser = argparse.ArgumentParser(description = "Check D* Lite repairs against fresh searches.")
+    parser.add_argument("--rounds", type = int, default = 5, help = "rounds of edits per query")
+    parser.add_argument("--cells", type = int, default = 300, help = "cells edited per round")
+    parser.add_argument("--queries", type = int, default = 4, help = "number of random start/goal pairs")
+    parser.add_argument("--seed", type = int, default = 0, help = "random seed for the queries and edits")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    failures = 0
+    for query in range(args.queries):
+        planner = Planner(0, 0)
+        (rows, cols) = planner.free.nonzero()
+        cells = [(int(row), int(col)) for (row, col) in zip(rows + 1, cols + 1)]
+        stepSize = rng.choice((1, 2))
+        startCell = rng.choice(cells)
+        goalCell = rng.choice([cell for cell in cells if (cell[0] - startCell[0]) % stepSize == 0 and (cell[1] - startCell[1]) % stepSize == 0])
+        dstar = DStarLite(planner, startCell, goalCell, stepSize)
+        dstar.plan()
+
+        # block random cells, and later free some of them again, away from the start and the goal
+        blocked = []
+        for round in range(args.rounds):
+            candidates = [cell for cell in cells if cell != startCell and cell != goalCell]
+            if(round % 2 == 1 and len(blocked) > 0):
+                (edited, isBlocked) = (rng.sample(blocked, min(args.cells, len(blocked))), False)
+                freed = set(edited)
+                blocked = [cell for cell in blocked if cell not in freed]
+            else:
+                (edited, isBlocked) = (rng.sample(candidates, args.cells), True)
+                blocked = blocked + edited
+            dstar.UpdateCells(edited, isBlocked)
+            repaired = dstar.plan()[2]
+            fresh = planner.plan(startCell, goalCell, stepSize)[2]
+            same = (repaired == fresh) if float('inf') in (repaired, fresh) else abs(repaired - fresh) <= COST_TOLERANCE
+            print("query %d round %d: %s -> %s step %d, repaired %.3f fresh %.3f%s" % (query, round, startCell, goalCell, stepSize, repaired, fresh, "" if same else "  MISMATCH"))
+            if(not same):
+                failures = failures + 1
+
+    print("%d mismatches" % failures)
+    sys.exit(1 if failures > 0 else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,15 +6,17 @@ Features:
 - Click to set start (left-click) and goal (right-click) points
 - Adjustable parameters: robot radius, clearance, step size
 - Animated search visualization with speed control
+- Search runs on a worker thread with live progress and cancellation
 - Modern dark theme
 """
 
+import queue
+import threading
+import time
 import tkinter as tk
 from tkinter import ttk
-from utils import AStar
-from gui_config import (
-    GRID_WIDTH, GRID_HEIGHT, SCALE, COLORS, DEFAULTS, PARAM_RANGES
-)
+from utils import get_planner, DEFAULT_MAP
+from gui_config import COLORS, DEFAULTS, PARAM_RANGES, SEARCH_BATCH
 from gui_canvas import PathCanvas
 
 
@@ -27,12 +29,19 @@ class AStarGUI:
         self.root.configure(bg=COLORS['background'])
         self.root.resizable(False, False)
 
+        # Map to plan on
+        self.world_map = DEFAULT_MAP
+
         # State
         self.is_animating = False
         self.animation_id = None
+        self.worker = None
+        self.cancel = None
+        self.results = None
+        self.search_started = 0.0
+        self.explored_count = 0
         self.explored_states = []
         self.path_states = []
-        self.anim_index = 0
 
         # Setup UI
         self._setup_styles()
@@ -93,7 +102,7 @@ class AStarGUI:
         instructions.pack(pady=(0, 10))
 
         # Canvas
-        self.canvas = PathCanvas(main_frame, AStar)
+        self.canvas = PathCanvas(main_frame, self._get_planner, self.world_map)
         self.canvas.pack(pady=10)
 
         # Control panel
@@ -334,17 +343,21 @@ class AStarGUI:
         if self.is_animating:
             return
         row, col = self.canvas.canvas_to_grid(event.x, event.y)
-        if 1 <= row <= GRID_HEIGHT and 1 <= col <= GRID_WIDTH:
+        if 1 <= row <= self.world_map.numRows and 1 <= col <= self.world_map.numCols:
             # Could update a coordinate display here if desired
             pass
 
+    def _get_planner(self, clearance, radius):
+        """Shared planner for a footprint on the GUI's map."""
+        return get_planner(clearance, radius, self.world_map)
+
     def _is_valid_position(self, row, col):
         """Check if a position is valid (in bounds and not obstacle)."""
         radius = self.radius_var.get()
         clearance = self.clearance_var.get()
 
-        temp_astar = AStar((row, col), (row, col), clearance, radius, 1)
-        return temp_astar.IsValid(row, col) and not temp_astar.IsObstacle(row, col)
+        planner = self._get_planner(clearance, radius)
+        return planner.IsValid(row, col) and not planner.IsObstacle(row, col)
 
     def _on_run(self):
         """Run the A* search algorithm."""
@@ -369,81 +382,98 @@ class AStarGUI:
         clearance = self.clearance_var.get()
         step_size = self.step_size_var.get()
 
-        # Create AStar instance and run search
-        self.status_label.config(text="Status: Searching...", fg=COLORS['explored'])
-        self.root.update()
-
-        astar = AStar(start, goal, clearance, radius, step_size)
+        # Look up the shared planner for this footprint
+        planner = self._get_planner(clearance, radius)
 
         # Validate start and goal with current parameters
-        if not astar.IsValid(start[0], start[1]) or astar.IsObstacle(start[0], start[1]):
+        if not planner.IsValid(start[0], start[1]) or planner.IsObstacle(start[0], start[1]):
             self.status_label.config(text="Status: Start is invalid with current params!", fg=COLORS['obstacle'])
             return
-        if not astar.IsValid(goal[0], goal[1]) or astar.IsObstacle(goal[0], goal[1]):
+        if not planner.IsValid(goal[0], goal[1]) or planner.IsObstacle(goal[0], goal[1]):
             self.status_label.config(text="Status: Goal is invalid with current params!", fg=COLORS['obstacle'])
             return
 
-        # Run search
-        explored, path, distance = astar.search()
-
-        self.explored_states = explored
-        self.path_states = path
-        self.anim_index = 0
+        # Start the search on a worker thread, it hands batches of explored
+        # cells to the main loop through a queue and stops when cancel is set
+        self.status_label.config(text="Status: Searching...", fg=COLORS['explored'])
+        self.cancel = threading.Event()
+        self.results = queue.Queue()
+        self.worker = threading.Thread(
+            target=self._search_worker,
+            args=(planner, start, goal, step_size, self.cancel, self.results),
+            daemon=True
+        )
+        self.search_started = time.time()
+        self.worker.start()
+        self.explored_count = 0
+        self.explored_states = []
+        self.path_states = []
+        self.distance_label.config(text="Distance: ---")
+        self.is_animating = True
+        self.run_button.config(state='disabled')
+        self.stop_button.config(state='normal')
+        self._animate_step()
 
-        print(f"Search complete: {len(explored)} explored, {len(path)} path nodes, distance={distance}")
+    @staticmethod
+    def _search_worker(planner, start, goal, step_size, cancel, results):
+        """Run the search off the Tk thread, queueing (batch, stats, result) tuples.
 
-        if distance == float('inf') or len(path) == 0:
-            self.status_label.config(text="Status: No path found!", fg=COLORS['obstacle'])
-            self.distance_label.config(text="Distance: ---")
-            # Still show explored states
-            if len(explored) > 0:
-                self.is_animating = True
-                self.run_button.config(state='disabled')
-                self.stop_button.config(state='normal')
-                self._animate_step()
-        else:
-            self.distance_label.config(text=f"Distance: {distance:.2f}")
-            # Start animation
-            self.is_animating = True
-            self.run_button.config(state='disabled')
-            self.stop_button.config(state='normal')
-            self._animate_step()
+        The planner is shared by footprint, so only one search may run on it
+        at a time; STOP waits for the worker before another RUN can start.
+        """
+        for batch, result in planner.iter_search(start, goal, step_size, SEARCH_BATCH, cancel=cancel):
+            results.put((batch, dict(planner.stats), result))
 
     def _animate_step(self):
-        """Animate one step of the search visualization."""
+        """Draw the cells the worker explored since the last frame and show its progress."""
         if not self.is_animating:
             return
 
-        # Draw batch of explored cells
-        batch_size = max(1, len(self.explored_states) // 200)
-        for _ in range(batch_size):
-            if self.anim_index < len(self.explored_states):
-                state = self.explored_states[self.anim_index]
-                self.canvas.draw_explored_cell(state)
-                self.anim_index += 1
-
-        # Update status
-        progress = int((self.anim_index / len(self.explored_states)) * 100) if self.explored_states else 100
-        self.status_label.config(text=f"Status: Exploring... {progress}%", fg=COLORS['explored'])
+        # Take every batch queued since the last frame, the frame costs the same however many there are
+        batch, stats, result = [], None, None
+        while result is None:
+            try:
+                cells, stats, result = self.results.get_nowait()
+            except queue.Empty:
+                break
+            batch.extend(cells)
+        self.canvas.draw_explored_cells(batch)
+        self.explored_count += len(batch)
+
+        # Update status with the expansion rate and the size of the open list
+        if stats is not None:
+            rate = stats['expansions'] / max(time.time() - self.search_started, 1e-6)
+            self.status_label.config(
+                text=f"Status: Exploring... {self.explored_count} cells, {rate:,.0f}/s, frontier {stats['frontier']}",
+                fg=COLORS['explored']
+            )
 
         # Force canvas update
         self.canvas.update_idletasks()
 
-        if self.anim_index < len(self.explored_states):
+        if result is None:
             # Schedule next frame
             delay = self.speed_var.get()
             self.animation_id = self.root.after(delay, self._animate_step)
-        else:
-            # Done exploring, draw path
-            self._draw_final_path()
+            return
+
+        # Search finished, draw path
+        self.worker.join()
+        self.worker = None
+        explored, path, distance = result
+        self.explored_states = explored
+        self.path_states = path
+        print(f"Search complete: {len(explored)} explored, {len(path)} path nodes, distance={distance}")
+        if distance != float('inf') and len(path) > 0:
+            self.distance_label.config(text=f"Distance: {distance:.2f}")
+        self._draw_final_path()
 
     def _draw_final_path(self):
         """Draw the final path after exploration animation."""
         self.canvas.raise_markers()
 
         if self.path_states:
-            for state in self.path_states:
-                self.canvas.draw_path_cell(state)
+            self.canvas.draw_path(self.path_states)
             self.canvas.raise_markers()
             self.status_label.config(text="Status: Path found!", fg=COLORS['path'])
         else:
@@ -454,10 +484,15 @@ class AStarGUI:
         self.stop_button.config(state='disabled')
 
     def _on_stop(self):
-        """Stop the current animation."""
+        """Stop the current search and its animation."""
         if self.animation_id:
             self.root.after_cancel(self.animation_id)
             self.animation_id = None
+        if self.worker:
+            # The search checks the token every few hundred expansions
+            self.cancel.set()
+            self.worker.join()
+            self.worker = None
         self.is_animating = False
         self.run_button.config(state='normal')
         self.stop_button.config(state='disabled')
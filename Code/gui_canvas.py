@@ -1,31 +1,50 @@
 # Canvas rendering for A* Path Planning GUI
 
 import tkinter as tk
-from gui_config import (
-    GRID_WIDTH, GRID_HEIGHT, SCALE, CANVAS_WIDTH, CANVAS_HEIGHT,
-    COLORS, POINT_MARKER_SIZE
-)
+import numpy as np
+from gui_config import SCALE, COLORS, POINT_MARKER_SIZE
+
+
+def hex_to_rgb(color):
+    """Convert a '#rrggbb' color to an (r, g, b) tuple."""
+    return tuple(int(color[i:i + 2], 16) for i in (1, 3, 5))
+
+
+def photo_image(pixels):
+    """Build a Tk photo image from an (height, width, 3) uint8 RGB array.
+
+    The array is handed to Tk as a binary PPM buffer, so the image is
+    decoded in one call instead of being drawn item by item.
+    """
+    height, width = pixels.shape[:2]
+    header = f'P6 {width} {height} 255\n'.encode()
+    return tk.PhotoImage(data=header + np.ascontiguousarray(pixels).tobytes(), format='PPM')
 
 
 class PathCanvas(tk.Canvas):
     """Custom canvas for rendering the A* path planning visualization."""
 
-    def __init__(self, parent, astar_class, **kwargs):
+    def __init__(self, parent, planner_factory, world_map, **kwargs):
         super().__init__(
             parent,
-            width=CANVAS_WIDTH,
-            height=CANVAS_HEIGHT,
+            width=world_map.numCols * SCALE,
+            height=world_map.numRows * SCALE,
             bg=COLORS['canvas_bg'],
             highlightthickness=2,
             highlightbackground=COLORS['text_secondary'],
             **kwargs
         )
-        self.astar_class = astar_class
+        self.planner_factory = planner_factory
+        self.world_map = world_map
         self.start_point = None
         self.goal_point = None
-        self.obstacle_items = []
-        self.explored_items = []
-        self.path_items = []
+        # Grid sized color buffers, the explored and path cells are painted
+        # into the layer and composed over the obstacles into one image
+        self.obstacle_pixels = None
+        self.layer_pixels = np.zeros((world_map.numRows, world_map.numCols, 3), dtype=np.uint8)
+        self.layer_mask = np.zeros((world_map.numRows, world_map.numCols), dtype=bool)
+        self.raster_image = None
+        self.raster_item = None
         self.start_marker = None
         self.goal_marker = None
 
@@ -36,70 +55,75 @@ class PathCanvas(tk.Canvas):
         Canvas uses 0-indexed (x, y) where y=0 is at the top.
         """
         x = (col - 1) * SCALE
-        y = (GRID_HEIGHT - row) * SCALE
+        y = (self.world_map.numRows - row) * SCALE
         return x, y
 
     def canvas_to_grid(self, x, y):
         """Convert canvas coordinates to AStar grid coordinates."""
         col = (x // SCALE) + 1
-        row = GRID_HEIGHT - (y // SCALE)
+        row = self.world_map.numRows - (y // SCALE)
         return row, col
 
     def draw_obstacles(self, radius=0, clearance=0):
-        """Draw all obstacles on the canvas using the AStar IsObstacle method."""
-        # Clear existing obstacles
-        for item in self.obstacle_items:
-            self.delete(item)
-        self.obstacle_items = []
-
-        # Create a temporary AStar instance to check obstacles
-        temp_astar = self.astar_class((1, 1), (1, 1), clearance, radius, 1)
-
-        # Iterate through grid and draw obstacles
-        for row in range(1, GRID_HEIGHT + 1):
-            for col in range(1, GRID_WIDTH + 1):
-                if temp_astar.IsObstacle(row, col):
-                    x, y = self.grid_to_canvas(row, col)
-                    item = self.create_rectangle(
-                        x, y, x + SCALE, y + SCALE,
-                        fill=COLORS['obstacle'],
-                        outline='',
-                        tags='obstacle'
-                    )
-                    self.obstacle_items.append(item)
-
-    def draw_cell(self, row, col, color, tag='cell'):
-        """Draw a single cell at the given grid position."""
-        x, y = self.grid_to_canvas(row, col)
-        item = self.create_rectangle(
-            x, y, x + SCALE, y + SCALE,
-            fill=color,
-            outline='',
-            tags=tag
-        )
-        return item
-
-    def draw_explored_cell(self, state):
-        """Draw an explored state cell."""
-        row, col = state
-        item = self.draw_cell(row, col, COLORS['explored'], 'explored')
-        self.explored_items.append(item)
-        return item
-
-    def draw_path_cell(self, state):
-        """Draw a path cell with emphasis."""
-        row, col = state
-        x, y = self.grid_to_canvas(row, col)
-        # Draw slightly larger for visibility
-        item = self.create_rectangle(
-            x, y, x + SCALE, y + SCALE,
-            fill=COLORS['path'],
-            outline=COLORS['path_outline'],
-            width=1,
-            tags='path'
-        )
-        self.path_items.append(item)
-        return item
+        """Draw all obstacles on the canvas from the planner's occupancy grid.
+
+        The grid is colored with NumPy into the buffer under the explored and
+        path layers, so a redraw costs the same for any number of obstacle cells.
+        """
+        # The planner for this footprint is shared, so its grid is only built once
+        planner = self.planner_factory(clearance, radius)
+
+        self.obstacle_pixels = np.empty(planner.obstacles.shape + (3,), dtype=np.uint8)
+        self.obstacle_pixels[:] = hex_to_rgb(COLORS['canvas_bg'])
+        self.obstacle_pixels[planner.obstacles] = hex_to_rgb(COLORS['obstacle'])
+        self.blit()
+
+    def draw_explored_cells(self, states):
+        """Paint a batch of explored states into the layer and show the frame.
+
+        Bidirectional searches tag each state with the side that expanded it
+        as (row, col, side); cells found from the goal side get their own color.
+        """
+        if len(states) > 0:
+            states = np.asarray(states, dtype=np.int64).reshape(len(states), -1)
+            rows, cols = states[:, 0] - 1, states[:, 1] - 1
+            colors = np.empty((len(states), 3), dtype=np.uint8)
+            colors[:] = hex_to_rgb(COLORS['explored'])
+            if states.shape[1] > 2:
+                colors[states[:, 2] == 1] = hex_to_rgb(COLORS['explored_reverse'])
+            self.layer_pixels[rows, cols] = colors
+            self.layer_mask[rows, cols] = True
+        self.blit()
+
+    def draw_path(self, states):
+        """Paint the path over the explored states and show the frame."""
+        if len(states) > 0:
+            states = np.asarray(states, dtype=np.int64).reshape(len(states), -1)
+            rows, cols = states[:, 0] - 1, states[:, 1] - 1
+            self.layer_pixels[rows, cols] = hex_to_rgb(COLORS['path'])
+            self.layer_mask[rows, cols] = True
+        self.blit()
+
+    def blit(self):
+        """Compose the layer over the obstacles and swap it in as the canvas image.
+
+        The cost is one image of the canvas size however many cells were
+        painted, and the canvas keeps a single item for all of them.
+        """
+        if self.obstacle_pixels is None:
+            return
+
+        # Row 1 is at the bottom of the canvas, every cell is SCALE pixels wide
+        pixels = np.where(self.layer_mask[..., None], self.layer_pixels, self.obstacle_pixels)
+        pixels = pixels[::-1].repeat(SCALE, axis=0).repeat(SCALE, axis=1)
+
+        # Swap the new image into the raster item, keeping it below the markers
+        self.raster_image = photo_image(pixels)
+        if self.raster_item is None:
+            self.raster_item = self.create_image(0, 0, anchor='nw', image=self.raster_image, tags='raster')
+        else:
+            self.itemconfigure(self.raster_item, image=self.raster_image)
+        self.tag_lower('raster')
 
     def set_start(self, row, col):
         """Set and draw the start point."""
@@ -147,13 +171,8 @@ class PathCanvas(tk.Canvas):
 
     def clear_path(self):
         """Clear explored states and path, keep start/goal."""
-        for item in self.explored_items:
-            self.delete(item)
-        self.explored_items = []
-
-        for item in self.path_items:
-            self.delete(item)
-        self.path_items = []
+        self.layer_mask[:] = False
+        self.blit()
 
         # Re-raise start and goal markers
         if self.start_marker:
@@ -1,16 +1,8 @@
 # Configuration and color scheme for A* Path Planning GUI
 
-# Grid dimensions (matches AStar class)
-GRID_WIDTH = 300
-GRID_HEIGHT = 200
-
-# Scale factor for canvas (2x for better visibility)
+# Scale factor for canvas (3x for better visibility), the grid size comes from the map
 SCALE = 3
 
-# Canvas dimensions
-CANVAS_WIDTH = GRID_WIDTH * SCALE
-CANVAS_HEIGHT = GRID_HEIGHT * SCALE
-
 # Color scheme (modern dark theme)
 COLORS = {
     # Background
@@ -32,8 +24,8 @@ COLORS = {
 
     # Search visualization
     'explored': '#4a90d9',
+    'explored_reverse': '#9b59b6',
     'path': '#f1c40f',
-    'path_outline': '#ffffff',
 
     # UI elements
     'text': '#eaeaea',
@@ -60,5 +52,8 @@ PARAM_RANGES = {
     'animation_speed': (1, 50),
 }
 
+# Cells the search worker expands per queued batch
+SEARCH_BATCH = 64
+
 # Point marker size (radius in pixels)
 POINT_MARKER_SIZE = 8
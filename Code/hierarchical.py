@@ -0,0 +1,313 @@
+# header files
+import numpy as np
+from heapq import heappush, heappop
+
+
+# shortest run of free cell pairs along a border that gets a transition at each end instead of one in the middle
+LONG_ENTRANCE = 6
+
+
+# transitions across a border line: first and second are the free cells on either side of it, a run of free pairs
+# never continues past a multiple of clusterSize; returns the positions along the line that get a transition
+def transitions(first, second, clusterSize):
+    pairs = first & second
+    previous = np.concatenate(([False], pairs[:-1]))
+    previous[::clusterSize] = False
+    following = np.concatenate((pairs[1:], [False]))
+    following[clusterSize - 1::clusterSize] = False
+    result = []
+    for (begin, end) in zip(np.flatnonzero(pairs & ~previous), np.flatnonzero(pairs & ~following)):
+        if(end - begin + 1 >= LONG_ENTRANCE):
+            result.append(int(begin))
+            result.append(int(end))
+        else:
+            result.append(int((begin + end) // 2))
+    return result
+
+
+# class for the abstract graph of hierarchical a-star (HPA*): the step size 1 lattice is split into square clusters,
+# free cell pairs across each cluster border become transition nodes, and every cluster caches the costs and paths
+# between its own nodes; borders are found for the whole map up front, cluster tables are built on first use and
+# only the clusters around changed cells are dropped
+class Hierarchy(object):
+    # init function
+    def __init__(self, planner, clusterSize = 32):
+        self.planner = planner
+        self.clusterSize = clusterSize
+        self.clusterRows = -(-planner.numRows // clusterSize)
+        self.clusterCols = -(-planner.numCols // clusterSize)
+        self.borders = {}
+        self.crossings = {}
+        self.tables = {}
+        (_, moves, table) = planner.Moves(1)
+        (self.moves, self.table) = (moves, table)
+        self.inside = self.InsideMask()
+        self._inside = memoryview(self.inside)
+        self.FindBorders()
+
+    # cluster of a flat index
+    def ClusterOf(self, index):
+        (row, col) = divmod(index, self.planner.numCols)
+        return (row // self.clusterSize) * self.clusterCols + col // self.clusterSize
+
+    # per-cell bitmask of the moves that stay inside the cell's cluster, and-ed with the move mask by local searches
+    def InsideMask(self):
+        size = self.clusterSize
+        inside = np.full((self.planner.numRows, self.planner.numCols), 255, dtype=np.uint8)
+        for (bit, (dRow, dCol)) in enumerate(self.planner.actions):
+            clear = np.uint8(255 ^ (1 << bit))
+            if(dRow == 1):
+                inside[size - 1::size] &= clear
+            if(dRow == -1):
+                inside[::size] &= clear
+            if(dCol == 1):
+                inside[:, size - 1::size] &= clear
+            if(dCol == -1):
+                inside[:, ::size] &= clear
+        return inside.reshape(-1)
+
+    # transitions of every border, one vectorized pass per line between two cluster rows or columns
+    def FindBorders(self):
+        (free, numCols, size) = (self.planner.free, self.planner.numCols, self.clusterSize)
+        for boundary in range(size, self.planner.numRows, size):
+            for col in transitions(free[boundary - 1], free[boundary], size):
+                cluster = (boundary // size - 1) * self.clusterCols + col // size
+                pair = ((boundary - 1) * numCols + col, boundary * numCols + col)
+                self.borders.setdefault((cluster, cluster + self.clusterCols), []).append(pair)
+        for boundary in range(size, numCols, size):
+            for row in transitions(free[:, boundary - 1], free[:, boundary], size):
+                cluster = (row // size) * self.clusterCols + boundary // size - 1
+                pair = (row * numCols + boundary - 1, row * numCols + boundary)
+                self.borders.setdefault((cluster, cluster + 1), []).append(pair)
+        for pairs in self.borders.values():
+            self.Link(pairs, True)
+
+    # add or remove the crossing edges of a border's transitions
+    def Link(self, pairs, add):
+        cost = self.planner.actionCost[0]
+        for (first, second) in pairs:
+            for (source, target) in ((first, second), (second, first)):
+                if(add):
+                    self.crossings.setdefault(source, []).append((target, cost))
+                else:
+                    self.crossings[source].remove((target, cost))
+                    if(len(self.crossings[source]) == 0):
+                        del self.crossings[source]
+
+    # recompute the transitions of one border after cells on it changed
+    def FindBorder(self, first, second):
+        (free, numCols, size) = (self.planner.free, self.planner.numCols, self.clusterSize)
+        self.Link(self.borders.pop((first, second), []), False)
+        (row, col) = divmod(first, self.clusterCols)
+        (top, left) = (row * size, col * size)
+        if(second == first + self.clusterCols):
+            span = slice(left, min(left + size, numCols))
+            pairs = [((top + size - 1) * numCols + left + offset, (top + size) * numCols + left + offset)
+                     for offset in transitions(free[top + size - 1, span], free[top + size, span], size)]
+        else:
+            span = slice(top, min(top + size, self.planner.numRows))
+            pairs = [((top + offset) * numCols + left + size - 1, (top + offset) * numCols + left + size)
+                     for offset in transitions(free[span, left + size - 1], free[span, left + size], size)]
+        if(len(pairs) > 0):
+            self.borders[(first, second)] = pairs
+            self.Link(pairs, True)
+
+    # transition nodes inside a cluster
+    def Nodes(self, cluster):
+        nodes = []
+        for (key, side) in (((cluster - self.clusterCols, cluster), 1), ((cluster - 1, cluster), 1), ((cluster, cluster + 1), 0), ((cluster, cluster + self.clusterCols), 0)):
+            for pair in self.borders.get(key, ()):
+                if(pair[side] not in nodes):
+                    nodes.append(pair[side])
+        return nodes
+
+    # dijkstra from a cell that never leaves its cluster, stopping once every target is settled;
+    # returns (costs, parents) of the settled cells
+    def Local(self, source, targets):
+        (moves, inside, table) = (self.moves, self._inside, self.table)
+        remaining = set(targets)
+        remaining.discard(source)
+        (costs, parents) = ({source: 0.0}, {source: -1})
+        settled = set()
+        queue = [(0.0, source)]
+        while(len(queue) > 0 and len(remaining) > 0):
+            (cost, index) = heappop(queue)
+            if(index in settled):
+                continue
+            settled.add(index)
+            remaining.discard(index)
+            for (offset, weight) in table[moves[index] & inside[index]]:
+                neighbour = index + offset
+                if(cost + weight < costs.get(neighbour, float('inf'))):
+                    costs[neighbour] = cost + weight
+                    parents[neighbour] = index
+                    heappush(queue, (cost + weight, neighbour))
+        return (dict((index, costs[index]) for index in settled), parents)
+
+    # cells from a settled cell back to the source of a local search
+    def Trace(self, parents, index):
+        cells = []
+        while(index != -1):
+            cells.append(index)
+            index = parents[index]
+        return cells
+
+    # cached (edges, paths) of a cluster: edges maps a node to its (node, cost) neighbours inside the cluster and
+    # paths maps a (node, node) pair to the cells between them
+    def Table(self, cluster):
+        result = self.tables.get(cluster)
+        if(result is None):
+            (edges, paths) = ({}, {})
+            nodes = self.Nodes(cluster)
+            for node in nodes:
+                edges[node] = []
+            for (position, node) in enumerate(nodes):
+                (costs, parents) = self.Local(node, nodes[position + 1:])
+                for other in nodes[position + 1:]:
+                    if(other in costs):
+                        edges[node].append((other, costs[other]))
+                        edges[other].append((node, costs[other]))
+                        cells = self.Trace(parents, other)
+                        paths[(other, node)] = cells
+                        paths[(node, other)] = cells[::-1]
+            result = (edges, paths)
+            self.tables[cluster] = result
+        return result
+
+    # build the table of every cluster now instead of on first use
+    def Build(self):
+        for cluster in range(self.clusterRows * self.clusterCols):
+            self.Table(cluster)
+
+    # drop the tables of the clusters holding changed cells, and recompute the borders those cells lie on,
+    # which also changes the nodes of the cluster across the border; call after the planner's free grid changed
+    def Invalidate(self, cells):
+        (size, numRows, numCols) = (self.clusterSize, self.planner.numRows, self.planner.numCols)
+        (clusters, borders) = (set(), set())
+        for (row, col) in cells:
+            (row, col) = (row - 1, col - 1)
+            cluster = (row // size) * self.clusterCols + col // size
+            clusters.add(cluster)
+            if(row % size == 0 and row > 0):
+                borders.add((cluster - self.clusterCols, cluster))
+            if(row % size == size - 1 and row < numRows - 1):
+                borders.add((cluster, cluster + self.clusterCols))
+            if(col % size == 0 and col > 0):
+                borders.add((cluster - 1, cluster))
+            if(col % size == size - 1 and col < numCols - 1):
+                borders.add((cluster, cluster + 1))
+        for (first, second) in borders:
+            self.FindBorder(first, second)
+            clusters.add(first)
+            clusters.add(second)
+        for cluster in clusters:
+            self.tables.pop(cluster, None)
+
+
+# hierarchical a-star: the start and goal are connected to the nodes of their clusters by local searches, an a-star
+# over the abstract graph picks the clusters to cross and the cached cluster paths refine it back into cells;
+# paths are close to but not always as short as a flat search's, other step sizes fall back to a-star
+def hpa_search(planner, start, goal, stepSize):
+    if(stepSize != 1):
+        return planner.search(start, goal, stepSize)
+    hierarchy = planner.LoadHierarchy()
+    planner.goal = goal
+    planner.stepSize = stepSize
+    numCols = planner.numCols
+    (straight, diagonal) = (planner.actionCost[0], planner.actionCost[4])
+    startIndex = planner.Index(start[0], start[1])
+    goalIndex = planner.Index(goal[0], goal[1])
+    planner.stats = {'expansions': 0, 'pushes': 0, 'stale': 0, 'open': 0, 'local': 0, 'clusters': len(hierarchy.tables)}
+
+    # trivial queries: the goal is the start, or it can never be entered
+    if(startIndex == goalIndex):
+        return ([start], [start], 0.0)
+    if(not planner.free[goal[0] - 1, goal[1] - 1]):
+        return ([], [], float('inf'))
+
+    # connect the start and the goal to the nodes of their clusters, and to each other when they share one
+    (startCluster, goalCluster) = (hierarchy.ClusterOf(startIndex), hierarchy.ClusterOf(goalIndex))
+    startNodes = hierarchy.Nodes(startCluster)
+    goalNodes = hierarchy.Nodes(goalCluster)
+    (startCosts, startParents) = hierarchy.Local(startIndex, startNodes + ([goalIndex] if startCluster == goalCluster else []))
+    (goalCosts, goalParents) = hierarchy.Local(goalIndex, goalNodes)
+    startEdges = [(node, startCosts[node]) for node in startNodes + [goalIndex] if node in startCosts and node != startIndex]
+    goalEdges = dict((node, goalCosts[node]) for node in goalNodes if node in goalCosts)
+    local = len(startCosts) + len(goalCosts)
+
+    # octile distance to the goal, admissible with the 1.414 diagonal cost
+    (goalRow, goalCol) = divmod(goalIndex, numCols)
+
+    def heuristic(index):
+        (row, col) = divmod(index, numCols)
+        (dRow, dCol) = (abs(goalRow - row), abs(goalCol - col))
+        return diagonal * min(dRow, dCol) + straight * abs(dRow - dCol)
+
+    # a-star over the abstract graph, the nodes are flat cell indices
+    exploredStates = []
+    (costs, parents, closed) = ({startIndex: 0.0}, {startIndex: -1}, set())
+    queue = [(heuristic(startIndex), 0.0, startIndex)]
+    (pushes, stale) = (1, 0)
+    distance = float('inf')
+    while(len(queue) > 0):
+        (_, costToCome, currentIndex) = heappop(queue)
+        if(currentIndex in closed):
+            stale = stale + 1
+            continue
+        closed.add(currentIndex)
+        exploredStates.append(planner.Cell(currentIndex))
+        if(currentIndex == goalIndex):
+            distance = costToCome
+            break
+
+        if(currentIndex == startIndex):
+            edges = list(startEdges)
+        else:
+            edges = list(hierarchy.Table(hierarchy.ClusterOf(currentIndex))[0].get(currentIndex, ()))
+        edges.extend(hierarchy.crossings.get(currentIndex, ()))
+        if(currentIndex in goalEdges):
+            edges.append((goalIndex, goalEdges[currentIndex]))
+        for (index, weight) in edges:
+            if(index in closed):
+                continue
+            new_cost_to_come = costToCome + weight
+            if(new_cost_to_come < costs.get(index, float('inf'))):
+                costs[index] = new_cost_to_come
+                parents[index] = currentIndex
+                heappush(queue, (new_cost_to_come + heuristic(index), new_cost_to_come, index))
+                pushes = pushes + 1
+
+    planner.stats = {'expansions': len(exploredStates), 'pushes': pushes, 'stale': stale, 'open': len(queue), 'local': local, 'clusters': len(hierarchy.tables)}
+
+    # return if no path
+    if(distance == float('inf')):
+        return (exploredStates, [], distance)
+
+    # abstract path from the start to the goal
+    nodes = []
+    index = goalIndex
+    while(index != -1):
+        nodes.append(index)
+        index = parents[index]
+    nodes = list(reversed(nodes))
+
+    # refine every abstract edge into cells: local search paths at the ends, cached cluster paths inside,
+    # and a single step across a border
+    cells = [startIndex]
+    for (previous, current) in zip(nodes, nodes[1:]):
+        if(hierarchy.ClusterOf(previous) != hierarchy.ClusterOf(current)):
+            segment = [previous, current]
+        elif(previous == startIndex):
+            segment = hierarchy.Trace(startParents, current)[::-1]
+        elif(current == goalIndex):
+            segment = hierarchy.Trace(goalParents, previous)
+        else:
+            segment = hierarchy.Table(hierarchy.ClusterOf(current))[1][(previous, current)]
+        cells.extend(segment[1:])
+    backtrackStates = [planner.Cell(index) for index in cells]
+
+    # sum the step costs in path order so the distance matches the one a-star accumulates
+    distance = 0.0
+    for (previous, current) in zip(backtrackStates, backtrackStates[1:]):
+        distance = distance + (straight if previous[0] == current[0] or previous[1] == current[1] else diagonal)
+    return (exploredStates, backtrackStates, distance)
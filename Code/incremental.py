@@ -0,0 +1,160 @@
+# header files
+import numpy as np
+from heapq import heappush, heappop
+
+
+# keys closer than this compare equal, sums of 1 and 1.414 reached in different orders differ by rounding and a
+# cell whose key only rounds above the start's would be left inconsistent on the path
+KEY_TOLERANCE = 1e-6
+
+
+# class for D* Lite, an incremental planner that keeps its search state between calls and repairs only the part
+# of it affected by cells changing occupancy or by the robot moving; it searches from the goal towards the start
+# over the lattice and move table of a planner, which should not be shared with other users while cells change
+class DStarLite(object):
+    # init function
+    def __init__(self, planner, start, goal, stepSize):
+        self.planner = planner
+        self.stepSize = stepSize
+        self.start = planner.Index(start[0], start[1])
+        self.goal = planner.Index(goal[0], goal[1])
+        self.last = self.start
+        self.km = 0.0
+        self.g = np.full(planner.numCells, np.inf)
+        self.rhs = np.full(planner.numCells, np.inf)
+        self._g = memoryview(self.g)
+        self._rhs = memoryview(self.rhs)
+        self.queue = []
+        self.queued = {}
+        self.stats = {}
+        (self.straight, self.diagonal) = (planner.actionCost[0], planner.actionCost[4])
+        self.offsets = [(dRow * stepSize, dCol * stepSize, self.straight if dRow == 0 or dCol == 0 else self.diagonal) for (dRow, dCol) in planner.actions]
+        self._rhs[self.goal] = 0.0
+        self.Insert(self.goal)
+
+    # octile distance in steps between two cells, consistent with the 1.414 diagonal cost
+    def Heuristic(self, first, second):
+        (firstRow, firstCol) = divmod(first, self.planner.numCols)
+        (secondRow, secondCol) = divmod(second, self.planner.numCols)
+        (dRow, dCol) = (abs(firstRow - secondRow) / self.stepSize, abs(firstCol - secondCol) / self.stepSize)
+        return self.diagonal * min(dRow, dCol) + self.straight * abs(dRow - dCol)
+
+    # priority of a cell
+    def Key(self, index):
+        best = min(self._g[index], self._rhs[index])
+        return (best + self.Heuristic(self.start, index) + self.km, best)
+
+    # checks for a key ordered before another, ties within KEY_TOLERANCE fall through to the second component
+    def KeyLess(self, first, second):
+        if(abs(first[0] - second[0]) > KEY_TOLERANCE):
+            return first[0] < second[0]
+        return first[1] < second[1] - KEY_TOLERANCE
+
+    # queue a cell with its current key, older entries of the cell become stale
+    def Insert(self, index):
+        key = self.Key(index)
+        self.queued[index] = key
+        heappush(self.queue, (key, index))
+
+    # smallest valid entry of the queue, dropping stale ones
+    def Top(self):
+        while(len(self.queue) > 0):
+            (key, index) = self.queue[0]
+            if(self.queued.get(index) == key):
+                return (key, index)
+            heappop(self.queue)
+        return ((float('inf'), float('inf')), -1)
+
+    # in-bounds lattice neighbours of a cell with the cost of moving between them
+    def Neighbours(self, index):
+        (numRows, numCols) = (self.planner.numRows, self.planner.numCols)
+        (row, col) = divmod(index, numCols)
+        result = []
+        for (dRow, dCol, cost) in self.offsets:
+            if(0 <= row + dRow < numRows and 0 <= col + dCol < numCols):
+                result.append((index + dRow * numCols + dCol, cost))
+        return result
+
+    # recompute the one-step lookahead cost of a cell and requeue it if it is inconsistent
+    def UpdateVertex(self, index):
+        if(index != self.goal):
+            (_, moves, table) = self.planner.Moves(self.stepSize)
+            best = float('inf')
+            for (offset, cost) in table[moves[index]]:
+                candidate = cost + self._g[index + offset]
+                if(candidate < best):
+                    best = candidate
+            self._rhs[index] = best
+        self.queued.pop(index, None)
+        if(self._g[index] != self._rhs[index]):
+            self.Insert(index)
+
+    # propagate costs until the start is consistent, returns the cells expanded
+    def ComputeShortestPath(self):
+        exploredStates = []
+        while(True):
+            (key, index) = self.Top()
+            startKey = self.Key(self.start)
+            if(index == -1 or (not self.KeyLess(key, startKey) and self._rhs[self.start] == self._g[self.start])):
+                break
+            heappop(self.queue)
+            del self.queued[index]
+            exploredStates.append(self.planner.Cell(index))
+            newKey = self.Key(index)
+            if(self.KeyLess(key, newKey)):
+                self.Insert(index)
+            elif(self._g[index] > self._rhs[index]):
+                self._g[index] = self._rhs[index]
+                for (neighbour, _) in self.Neighbours(index):
+                    self.UpdateVertex(neighbour)
+            else:
+                self._g[index] = float('inf')
+                self.UpdateVertex(index)
+                for (neighbour, _) in self.Neighbours(index):
+                    self.UpdateVertex(neighbour)
+        return exploredStates
+
+    # move the robot to a new start cell, keys already queued stay valid through the km offset
+    def MoveStart(self, start):
+        index = self.planner.Index(start[0], start[1])
+        self.km = self.km + self.Heuristic(self.last, index)
+        self.last = index
+        self.start = index
+
+    # mark cells blocked or free and repair the costs around them
+    def UpdateCells(self, cells, blocked):
+        self.planner.UpdateCells(cells, blocked)
+        self.Repair(cells)
+
+    # repair the costs around cells whose occupancy already changed in the planner
+    def Repair(self, cells):
+        for (row, col) in cells:
+            index = self.planner.Index(row, col)
+            self.UpdateVertex(index)
+            for (neighbour, _) in self.Neighbours(index):
+                self.UpdateVertex(neighbour)
+
+    # bring the search up to date and return (exploredStates, backtrackStates, distance) from the current start
+    def plan(self):
+        exploredStates = self.ComputeShortestPath()
+        self.stats = {'expansions': len(exploredStates), 'queued': len(self.queued)}
+        if(self._g[self.start] == float('inf')):
+            return (exploredStates, [], float('inf'))
+
+        # follow the cheapest successor from the start, summing the step costs in path order
+        (_, moves, table) = self.planner.Moves(self.stepSize)
+        backtrackStates = [self.planner.Cell(self.start)]
+        distance = 0.0
+        index = self.start
+        while(index != self.goal):
+            (best, bestIndex, bestCost) = (float('inf'), -1, 0)
+            for (offset, cost) in table[moves[index]]:
+                candidate = cost + self._g[index + offset]
+                if(candidate < best):
+                    (best, bestIndex, bestCost) = (candidate, index + offset, cost)
+            if(bestIndex == -1):
+                return (exploredStates, [], float('inf'))
+            index = bestIndex
+            distance = distance + bestCost
+            backtrackStates.append(self.planner.Cell(index))
+        return (exploredStates, backtrackStates, distance)
@@ -0,0 +1,194 @@
+# header files
+import numpy as np
+
+
+# jump distances for an eastward move on every cell of a lattice with the given step size: k > 0 means the next
+# jump point is k steps away, k <= 0 means the ray runs over -k free cells and then hits a blocked one
+def east_jumps(blocked, stepSize):
+    (numRows, numCols) = blocked.shape
+    s = stepSize
+    padded = np.pad(blocked, s, mode = 'constant', constant_values = True)
+
+    # a cell has a forced neighbour for an eastward move when a side cell is blocked but the cell ahead of it is free
+    upBlocked = padded[0:numRows, s:s + numCols]
+    upAhead = padded[0:numRows, 2 * s:2 * s + numCols]
+    downBlocked = padded[2 * s:2 * s + numRows, s:s + numCols]
+    downAhead = padded[2 * s:2 * s + numRows, 2 * s:2 * s + numCols]
+    forced = (upBlocked & ~upAhead) | (downBlocked & ~downAhead)
+
+    # sweep from the east edge, every column only depends on the one a step further east
+    jumps = np.zeros((numRows, numCols), dtype = np.int32)
+    for col in range(numCols - 1 - s, -1, -1):
+        ahead = jumps[:, col + s]
+        jumps[:, col] = np.where(blocked[:, col + s], 0, np.where(forced[:, col + s], 1, np.where(ahead > 0, ahead + 1, ahead - 1)))
+    return jumps
+
+
+# straight jump tables of a planner for a step size, keyed by (row, col) direction and flattened like the search state
+def jump_tables(planner, stepSize):
+    tables = planner.jumpTables.get(stepSize)
+    if(tables is None):
+        blocked = ~planner.free
+        east = east_jumps(blocked, stepSize)
+        west = np.fliplr(east_jumps(np.fliplr(blocked), stepSize))
+        south = east_jumps(blocked.T, stepSize).T
+        north = np.flipud(east_jumps(np.flipud(blocked).T, stepSize).T)
+        tables = {}
+        for (direction, table) in (((0, 1), east), ((0, -1), west), ((1, 0), south), ((-1, 0), north)):
+            table = np.ascontiguousarray(table).reshape(-1)
+            tables[direction] = memoryview(table)
+        planner.jumpTables[stepSize] = tables
+    return tables
+
+
+# sign of a number
+def sign(value):
+    return int(value > 0) - int(value < 0)
+
+
+# jump point search on the planner's lattice, same moves and costs as a-star but only jump points enter the open list
+def jps_search(planner, start, goal, stepSize):
+    # plain ints, numpy integers (as np.nonzero gives them) would turn the sign arithmetic into numpy booleans
+    (start, goal) = ((int(start[0]), int(start[1])), (int(goal[0]), int(goal[1])))
+    planner.Reset()
+    planner.goal = goal
+    planner.stepSize = stepSize
+    numCols = planner.numCols
+    (_, moves, _) = planner.Moves(stepSize)
+    tables = jump_tables(planner, stepSize)
+    bits = dict((direction, bit) for (bit, direction) in enumerate(planner.actions))
+    offsets = dict((direction, (direction[0] * numCols + direction[1]) * stepSize) for direction in planner.actions)
+    (straight, diagonal) = (planner.actionCost[0], planner.actionCost[4])
+    (goalRow, goalCol) = (goal[0] - 1, goal[1] - 1)
+    goalIndex = planner.Index(goal[0], goal[1])
+
+    # checks whether the move in a direction from a cell lands on a free cell
+    def passable(index, direction):
+        return (moves[index] >> bits[direction]) & 1
+
+    # straight jump from a cell, returns the number of steps to the next jump point or to the goal, or 0
+    def jump_straight(index, direction):
+        steps = tables[direction][index]
+        (row, col) = divmod(index, numCols)
+        if(direction[0] == 0):
+            (along, across) = ((goalCol - col) * direction[1], goalRow - row)
+        else:
+            (along, across) = ((goalRow - row) * direction[0], goalCol - col)
+        if(across == 0 and along > 0 and along % stepSize == 0 and along // stepSize <= abs(steps)):
+            return along // stepSize
+        return max(steps, 0)
+
+    # diagonal jump from a cell, returns the number of steps to the next jump point, or 0
+    def jump_diagonal(index, direction):
+        (dRow, dCol) = direction
+        offset = offsets[direction]
+        steps = 0
+        while(passable(index, direction)):
+            index = index + offset
+            steps = steps + 1
+            if(index == goalIndex):
+                return steps
+            if((not passable(index, (-dRow, 0)) and passable(index, (-dRow, dCol))) or (not passable(index, (0, -dCol)) and passable(index, (dRow, -dCol)))):
+                return steps
+            if(jump_straight(index, (dRow, 0)) > 0 or jump_straight(index, (0, dCol)) > 0):
+                return steps
+        return 0
+
+    # directions left after pruning, given the direction the cell was entered from
+    def successors(index, direction):
+        if(direction is None):
+            return planner.actions
+        (dRow, dCol) = direction
+        if(dRow == 0):
+            return [direction] + [(side, dCol) for side in (1, -1) if not passable(index, (side, 0))]
+        if(dCol == 0):
+            return [direction] + [(dRow, side) for side in (1, -1) if not passable(index, (0, side))]
+        result = [(dRow, 0), (0, dCol), direction]
+        if(not passable(index, (-dRow, 0))):
+            result.append((-dRow, dCol))
+        if(not passable(index, (0, -dCol))):
+            result.append((dRow, -dCol))
+        return result
+
+    # octile distance in steps, exact on an empty lattice so it stays admissible and consistent
+    def heuristic(index):
+        (row, col) = divmod(index, numCols)
+        (dRow, dCol) = (abs(goalRow - row) / stepSize, abs(goalCol - col) / stepSize)
+        return diagonal * min(dRow, dCol) + straight * abs(dRow - dCol)
+
+    # mark source node and create a queue
+    exploredStates = []
+    queue = planner.NewOpenList()
+    (push, pop) = (queue.push, queue.pop)
+    (stamps, costs, parents, rounding) = (planner._stamp, planner._costToCome, planner._path, planner._rounding)
+    (generation, closed) = (planner.generation, planner.generation + 1)
+    startIndex = planner.Index(start[0], start[1])
+    stamps[startIndex] = generation
+    costs[startIndex] = 0
+    parents[startIndex] = -1
+    push((heuristic(startIndex), 0.0, startIndex))
+    (pushes, stale) = (1, 0)
+
+    # run jump point search
+    distance = float('inf')
+    while(len(queue) > 0):
+        _, costToCome, currentIndex = pop()
+        if(stamps[currentIndex] == closed):
+            stale = stale + 1
+            continue
+        stamps[currentIndex] = closed
+        exploredStates.append(planner.Cell(currentIndex))
+        if(currentIndex == goalIndex):
+            distance = costToCome
+            break
+
+        # direction the current jump point was reached from
+        direction = None
+        parent = parents[currentIndex]
+        if(parent != -1):
+            (row, col) = divmod(currentIndex, numCols)
+            (parentRow, parentCol) = divmod(parent, numCols)
+            direction = (sign(row - parentRow), sign(col - parentCol))
+
+        for newDirection in successors(currentIndex, direction):
+            if(newDirection[0] == 0 or newDirection[1] == 0):
+                steps = jump_straight(currentIndex, newDirection)
+                weight = straight
+            else:
+                steps = jump_diagonal(currentIndex, newDirection)
+                weight = diagonal
+            if(steps == 0):
+                continue
+            index = currentIndex + steps * offsets[newDirection]
+            stamp = stamps[index]
+            if(stamp == closed):
+                continue
+            new_cost_to_come = costToCome + steps * weight
+            rounding[0] = new_cost_to_come
+            if(stamp != generation or costs[index] > rounding[0]):
+                stamps[index] = generation
+                costs[index] = new_cost_to_come
+                parents[index] = currentIndex
+                push((new_cost_to_come + heuristic(index), new_cost_to_come, index))
+                pushes = pushes + 1
+
+    planner.stats = {'expansions': len(exploredStates), 'pushes': pushes, 'stale': stale, 'open': len(queue)}
+
+    # return if no optimal path
+    if(distance == float('inf')):
+        return (exploredStates, [], distance)
+
+    # backtrack path, filling in the lattice cells between consecutive jump points
+    backtrackStates = []
+    index = goalIndex
+    while(parents[index] != -1):
+        parent = parents[index]
+        (row, col) = divmod(index, numCols)
+        (parentRow, parentCol) = divmod(parent, numCols)
+        step = (sign(row - parentRow) * numCols + sign(col - parentCol)) * stepSize
+        while(index != parent):
+            backtrackStates.append(planner.Cell(index))
+            index = index - step
+    backtrackStates.append(planner.Cell(index))
+    backtrackStates = list(reversed(backtrackStates))
+    return (exploredStates, backtrackStates, distance)
@@ -0,0 +1,158 @@
+# header files
+import hashlib
+import os
+import tempfile
+import numpy as np
+from heapq import heappush, heappop
+
+
+# layout version of saved landmark files
+LANDMARK_FORMAT = 1
+
+
+# content hash of the cells a planner may move through
+def map_key(planner):
+    digest = hashlib.sha1()
+    digest.update(np.asarray(planner.free.shape, dtype=np.int64).tobytes())
+    digest.update(np.packbits(planner.free).tobytes())
+    return digest.hexdigest()
+
+
+# single source distances over the planner's step size 1 lattice, inf where a cell cannot be reached
+def dijkstra(planner, source):
+    (_, moves, table) = planner.Moves(1)
+    distance = np.full(planner.numCells, np.inf)
+    done = np.zeros(planner.numCells, dtype=np.uint8)
+    (dist, closed) = (memoryview(distance), memoryview(done))
+    dist[source] = 0.0
+    queue = [(0.0, source)]
+    while(len(queue) > 0):
+        (cost, index) = heappop(queue)
+        if(closed[index]):
+            continue
+        closed[index] = 1
+        for (offset, weight) in table[moves[index]]:
+            neighbour = index + offset
+            if(cost + weight < dist[neighbour]):
+                dist[neighbour] = cost + weight
+                heappush(queue, (cost + weight, neighbour))
+    return distance
+
+
+# class for landmark distance tables of one map and footprint
+class Landmarks(object):
+    # init function, distances has one row per cell and one column per landmark
+    def __init__(self, key, cells, distances):
+        self.key = key
+        self.cells = list(cells)
+        self.count = len(self.cells)
+        self.distances = np.ascontiguousarray(distances, dtype=np.float32)
+        self._distances = memoryview(self.distances.reshape(-1))
+
+    # pick landmarks by farthest point sampling and compute their distance tables
+    @classmethod
+    def build(cls, planner, count = 8):
+        free = np.flatnonzero(planner.free)
+        if(len(free) == 0):
+            return cls(map_key(planner), [], np.zeros((planner.numCells, 0)))
+
+        # start from the cell farthest from an arbitrary free cell, then keep adding the reachable cell
+        # farthest from every landmark chosen so far
+        seed = dijkstra(planner, int(free[0]))
+        cells = []
+        tables = []
+        nearest = np.where(np.isfinite(seed), seed, -1.0)
+        for _ in range(count):
+            cell = int(np.argmax(nearest))
+            if(nearest[cell] <= 0 and len(cells) > 0):
+                break
+            distance = dijkstra(planner, cell)
+            cells.append(cell)
+            tables.append(distance)
+            nearest = np.where(np.isfinite(distance), np.minimum(nearest, distance), nearest)
+        return cls(map_key(planner), cells, np.stack(tables, axis=1))
+
+    # save to an .npz file at exactly path, through a temporary file in the same directory replaced in one step so
+    # readers never see a partial file
+    def save(self, path):
+        (handle, temporary) = tempfile.mkstemp(suffix = '.npz', dir = os.path.dirname(os.path.abspath(path)))
+        try:
+            with os.fdopen(handle, 'wb') as stream:
+                np.savez(stream, format=LANDMARK_FORMAT, key=self.key, cells=np.asarray(self.cells, dtype=np.int64), distances=self.distances)
+            os.chmod(temporary, 0o644)
+            os.replace(temporary, path)
+        except BaseException:
+            os.remove(temporary)
+            raise
+
+    # names of the cached arrays of count landmarks, keyed by the content hash of the free cells
+    @staticmethod
+    def names(key, count):
+        return ("landmarks-%s-k%d-distances" % (key, count), "landmarks-%s-k%d-cells" % (key, count))
+
+    # put the tables in a mapcache.MapCache as .npy files, the distances before the cells so a reader that finds
+    # the cells finds the distances too; tables without landmarks are not stored
+    def store(self, cache, worldMap, count):
+        if(self.count == 0):
+            return
+        (distances, cells) = Landmarks.names(self.key, count)
+        cache.Store(worldMap, distances, self.distances, (None, self.count))
+        cache.Store(worldMap, cells, np.asarray(self.cells, dtype=np.int64), (self.count,))
+
+    # tables from a mapcache.MapCache, the distances stay memory-mapped so processes share their pages;
+    # None if they were never stored
+    @classmethod
+    def fetch(cls, cache, worldMap, key, count):
+        (distances, cells) = Landmarks.names(key, count)
+        cells = cache.Load(worldMap, cells, (None,))
+        if(cells is None):
+            return None
+        distances = cache.Load(worldMap, distances, (worldMap.numRows * worldMap.numCols, len(cells)))
+        if(distances is None or distances.dtype != np.float32):
+            return None
+        return cls(key, cells.tolist(), distances)
+
+    # load from an .npz file, returns None if it is missing, stale or from another map
+    @classmethod
+    def load(cls, path, key):
+        if(not os.path.exists(path)):
+            return None
+        with np.load(path) as data:
+            if(int(data['format']) != LANDMARK_FORMAT or str(data['key']) != key):
+                return None
+            return cls(key, data['cells'].tolist(), data['distances'])
+
+    # admissible heuristic towards a goal cell from the triangle inequality, max over landmarks of |d(L, goal) - d(L, v)|,
+    # never below the given fallback heuristic; inf for cells a landmark proves cannot reach the goal
+    def bound(self, goalIndex, fallback):
+        (count, table) = (self.count, self._distances)
+        pairs = [(k, table[goalIndex * count + k]) for k in range(count) if table[goalIndex * count + k] != float('inf')]
+
+        def heuristic(index):
+            best = fallback(index)
+            base = index * count
+            for (k, target) in pairs:
+                difference = table[base + k] - target
+                if(difference < 0):
+                    difference = -difference
+                if(difference > best):
+                    best = difference
+            return best
+        return heuristic
+
+
+# landmark tables for a planner, read from the .npz file at path (read into memory) or else from a map cache
+# (memory-mapped) when they hold tables for the same cells, and written there otherwise
+def landmark_table(planner, count = 8, path = None, cache = None):
+    key = map_key(planner)
+    if(path is not None):
+        landmarks = Landmarks.load(path, key)
+    else:
+        landmarks = Landmarks.fetch(cache, planner.map, key, count) if cache is not None else None
+    if(landmarks is None):
+        landmarks = Landmarks.build(planner, count)
+        if(path is not None):
+            landmarks.save(path)
+        elif(cache is not None):
+            landmarks.store(cache, planner.map, count)
+    return landmarks
@@ -0,0 +1,48 @@
+# header files
+import os
+import tempfile
+import numpy as np
+
+
+# layout version of cache files, part of every file name so older files are never read
+CACHE_FORMAT = 1
+
+
+# class for a directory of arrays built from maps, keyed by the map's content hash; arrays are saved as .npy files
+# and read back memory-mapped, so processes using the same map share the pages instead of rebuilding them
+class MapCache(object):
+    # init function
+    def __init__(self, directory):
+        self.directory = directory
+        if(not os.path.isdir(directory)):
+            os.makedirs(directory)
+
+    # file holding one named array of a map
+    def Path(self, worldMap, name, extension = '.npy'):
+        return os.path.join(self.directory, "%s-v%d-%s%s" % (worldMap.Key(), CACHE_FORMAT, name, extension))
+
+    # read-only memory map of a named array, None if it was never stored or its shape differs from shape, which
+    # defaults to the map's grid and may leave a dimension open with None
+    def Load(self, worldMap, name, shape = None):
+        path = self.Path(worldMap, name)
+        if(not os.path.exists(path)):
+            return None
+        array = np.load(path, mmap_mode = 'r')
+        shape = shape if shape is not None else (worldMap.numRows, worldMap.numCols)
+        if(len(array.shape) != len(shape) or any(size is not None and size != found for (size, found) in zip(shape, array.shape))):
+            return None
+        return array
+
+    # store a named array and return its memory map; written to a temporary file first and renamed into place,
+    # so processes filling the cache at the same time never read a partial file
+    def Store(self, worldMap, name, array, shape = None):
+        (handle, temporary) = tempfile.mkstemp(suffix = '.npy', dir = self.directory)
+        try:
+            with os.fdopen(handle, 'wb') as stream:
+                np.save(stream, np.ascontiguousarray(array))
+            os.chmod(temporary, 0o644)
+            os.replace(temporary, self.Path(worldMap, name))
+        except BaseException:
+            os.remove(temporary)
+            raise
+        return self.Load(worldMap, name, shape)
@@ -0,0 +1,202 @@
+# header files
+import hashlib
+import numpy as np
+import cv2
+
+
+# rows rasterized at a time, keeps the temporaries of a large primitive small
+RASTER_BAND = 256
+
+
+# inflated grids kept per map, the oldest margin is dropped first
+GRID_CACHE = 8
+
+
+# slack on polygon edge tests so cells exactly on an edge stay inside despite the rounding of unit normals
+EDGE_TOLERANCE = 1e-9
+
+
+# class for a circle obstacle, (row, col) of the center and its radius in cells
+class Circle(object):
+    # init function
+    def __init__(self, row, col, radius):
+        self.row = row
+        self.col = col
+        self.radius = radius
+
+    # checks for a cell inside the circle, works on scalars as well as on numpy arrays
+    def Contains(self, row, col):
+        return ((row - self.row) * (row - self.row) + (col - self.col) * (col - self.col)) <= self.radius * self.radius
+
+    # (first row, last row, first col, last col) of the cells the circle can cover
+    def Bounds(self):
+        return (self.row - self.radius, self.row + self.radius, self.col - self.radius, self.col + self.radius)
+
+
+# class for an axis aligned ellipse obstacle, (row, col) of the center and its semi-axes along rows and cols
+class Ellipse(object):
+    # init function
+    def __init__(self, row, col, rowRadius, colRadius):
+        self.row = row
+        self.col = col
+        self.rowRadius = rowRadius
+        self.colRadius = colRadius
+
+    # checks for a cell inside the ellipse
+    def Contains(self, row, col):
+        return (((row - self.row) * (row - self.row)) / (self.rowRadius * self.rowRadius)) + (((col - self.col) * (col - self.col)) / (self.colRadius * self.colRadius)) <= 1
+
+    # (first row, last row, first col, last col) of the cells the ellipse can cover
+    def Bounds(self):
+        return (self.row - self.rowRadius, self.row + self.rowRadius, self.col - self.colRadius, self.col + self.colRadius)
+
+
+# class for a convex polygon obstacle, (row, col) vertices in either winding order
+class ConvexPolygon(object):
+    # init function
+    def __init__(self, vertices):
+        self.vertices = [(float(row), float(col)) for (row, col) in vertices]
+
+        # edges as unit normals pointing into the polygon and offsets, a cell is inside when
+        # normal . cell >= offset holds for every edge
+        count = len(self.vertices)
+        winding = sum(x1 * y2 - x2 * y1 for ((x1, y1), (x2, y2)) in zip(self.vertices, self.vertices[1:] + self.vertices[:1]))
+        self.edges = []
+        for position in range(count):
+            ((x1, y1), (x2, y2)) = (self.vertices[position], self.vertices[(position + 1) % count])
+            length = np.hypot(x2 - x1, y2 - y1)
+            (normalRow, normalCol) = ((y1 - y2) / length, (x2 - x1) / length) if winding > 0 else ((y2 - y1) / length, (x1 - x2) / length)
+            self.edges.append((normalRow, normalCol, normalRow * x1 + normalCol * y1))
+
+    # checks for a cell inside the polygon
+    def Contains(self, row, col):
+        inside = True
+        for (normalRow, normalCol, offset) in self.edges:
+            inside = inside & (normalRow * row + normalCol * col >= offset - EDGE_TOLERANCE)
+        return inside
+
+    # (first row, last row, first col, last col) of the cells the polygon can cover
+    def Bounds(self):
+        (rows, cols) = zip(*self.vertices)
+        return (min(rows), max(rows), min(cols), max(cols))
+
+
+# class for a map: its size in cells and the obstacle primitives placed on it; the primitives are rasterized once,
+# a euclidean distance transform of that grid is kept, and the grid for a robot footprint is the distance field
+# thresholded at its clearance plus radius, so a footprint change never evaluates the geometry again; with a cache
+# (a mapcache.MapCache) the distance field and the grids are read from and written to disk instead
+class Map(object):
+    # init function
+    def __init__(self, numRows, numCols, obstacles = (), cache = None):
+        self.numRows = numRows
+        self.numCols = numCols
+        self.obstacles = list(obstacles)
+        self.cache = cache
+        self.raster = None
+        self.distance = None
+        self.grids = {}
+        self.version = 0
+
+    # pickled without the arrays built from the obstacles, a copy in another process rebuilds or maps them
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        state.update(raster = None, distance = None, grids = {})
+        return state
+
+    # content hash of the map's size and obstacles
+    def Key(self):
+        digest = hashlib.sha1()
+        digest.update(repr((self.numRows, self.numCols)).encode())
+        for obstacle in self.obstacles:
+            digest.update(repr((type(obstacle).__name__, sorted(vars(obstacle).items()))).encode())
+        return digest.hexdigest()
+
+    # place another obstacle, grids and the distance field built before are dropped and the version is bumped
+    # so planners built on the map notice the change
+    def Add(self, obstacle):
+        self.obstacles.append(obstacle)
+        self.version = self.version + 1
+        self.raster = None
+        self.distance = None
+        self.grids = {}
+
+    # checks for a cell inside an obstacle, works on scalars as well as on numpy arrays
+    def Contains(self, row, col):
+        result = False
+        for obstacle in self.obstacles:
+            result = result | obstacle.Contains(row, col)
+        return result
+
+    # boolean occupancy grid of shape (numRows, numCols) of the bare obstacles, cell (row, col) is at
+    # [row - 1, col - 1]; each obstacle is only tested on its bounding box, a band of rows at a time
+    def Raster(self):
+        if(self.raster is None):
+            grid = np.zeros((self.numRows, self.numCols), dtype=np.bool_)
+            for obstacle in self.obstacles:
+                (firstRow, lastRow, firstCol, lastCol) = obstacle.Bounds()
+                (firstRow, lastRow) = (max(int(np.floor(firstRow)), 1), min(int(np.ceil(lastRow)), self.numRows))
+                (firstCol, lastCol) = (max(int(np.floor(firstCol)), 1), min(int(np.ceil(lastCol)), self.numCols))
+                if(firstRow > lastRow or firstCol > lastCol):
+                    continue
+                cols = np.arange(firstCol, lastCol + 1).reshape(1, -1)
+                for band in range(firstRow, lastRow + 1, RASTER_BAND):
+                    rows = np.arange(band, min(band + RASTER_BAND, lastRow + 1)).reshape(-1, 1)
+                    grid[band - 1:band - 1 + len(rows), firstCol - 1:lastCol] |= obstacle.Contains(rows, cols)
+            grid.flags.writeable = False
+            self.raster = grid
+        return self.raster
+
+    # float32 euclidean distance from every cell to the nearest obstacle cell, 0 on obstacles and inf on a map without any
+    def Distance(self):
+        if(self.distance is None):
+            distance = self.cache.Load(self, 'distance') if self.cache is not None else None
+            if(distance is None):
+                raster = self.Raster()
+                if(raster.any()):
+                    distance = cv2.distanceTransform((~raster).astype(np.uint8), cv2.DIST_L2, cv2.DIST_MASK_PRECISE)
+                else:
+                    distance = np.full((self.numRows, self.numCols), np.inf, dtype=np.float32)
+                if(self.cache is not None):
+                    distance = self.cache.Store(self, 'distance', distance)
+            distance.flags.writeable = False
+            self.distance = distance
+        return self.distance
+
+    # occupancy grid with every obstacle grown by margin, the exact minkowski sum of the raster with a disc
+    def Grid(self, margin = 0):
+        grid = self.grids.get(margin)
+        if(grid is None):
+            name = 'grid-%g' % margin
+            grid = self.cache.Load(self, name) if self.cache is not None else None
+            if(grid is None):
+                grid = self.Distance() <= margin
+                if(self.cache is not None):
+                    grid = self.cache.Store(self, name, grid)
+            grid.flags.writeable = False
+            if(len(self.grids) >= GRID_CACHE):
+                del self.grids[next(iter(self.grids))]
+            self.grids[margin] = grid
+        return grid
+
+    # checks for a cell within margin of an obstacle, cells off the map are never obstacles
+    def IsObstacle(self, row, col, margin = 0):
+        if(row < 1 or row > self.numRows or col < 1 or col > self.numCols):
+            return False
+        return bool(self.Distance()[row - 1, col - 1] <= margin)
+
+
+# the obstacles of the original 200 x 300 map
+DEFAULT_OBSTACLES = [
+    Circle(150, 225, 25),
+    Ellipse(100, 150, 20, 40),
+    ConvexPolygon([(120, 20), (150, 50), (185, 25)]),
+    ConvexPolygon([(150, 50), (185, 25), (185, 75)]),
+    ConvexPolygon([(10, 225), (25, 200), (40, 225), (25, 250)]),
+    ConvexPolygon([(150, 50), (120, 75), (150, 100), (185, 75)]),
+    ConvexPolygon([(30, 95), (67.5, 30.05), (76.15, 35.5), (38.66, 100)]),
+]
+
+
+# the original map, optionally on a canvas of another size
+def default_map(numRows = 200, numCols = 300):
+    return Map(numRows, numCols, DEFAULT_OBSTACLES)
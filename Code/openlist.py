@@ -0,0 +1,130 @@
+# header files
+from functools import partial
+from heapq import heappush, heappop, heapify
+
+
+# binary heap with lazy deletion, superseded entries stay in the heap and are skipped by the caller when popped
+class HeapQueue(object):
+    # init function
+    def __init__(self):
+        self.items = []
+        self.push = partial(heappush, self.items)
+        self.pop = partial(heappop, self.items)
+    
+    # number of entries, including stale ones
+    def __len__(self):
+        return len(self.items)
+
+
+# binary heap of (f, g, index) entries with decrease-key, holds at most one entry per cell
+class IndexedHeap(object):
+    # init function
+    def __init__(self):
+        self.items = []
+        self.position = {}
+    
+    # number of entries
+    def __len__(self):
+        return len(self.items)
+    
+    # insert an entry, or lower the key of the cell's existing entry
+    def push(self, entry):
+        position = self.position.get(entry[2])
+        if(position is None):
+            self.items.append(entry)
+            self.SiftUp(len(self.items) - 1)
+        elif(entry < self.items[position]):
+            self.items[position] = entry
+            self.SiftUp(position)
+    
+    # remove and return the smallest entry
+    def pop(self):
+        items = self.items
+        top = items[0]
+        del self.position[top[2]]
+        last = items.pop()
+        if(len(items) > 0):
+            items[0] = last
+            self.SiftDown(0)
+        return top
+    
+    # move an entry towards the root
+    def SiftUp(self, position):
+        (items, positions) = (self.items, self.position)
+        entry = items[position]
+        while(position > 0):
+            parent = (position - 1) >> 1
+            if(items[parent] <= entry):
+                break
+            items[position] = items[parent]
+            positions[items[position][2]] = position
+            position = parent
+        items[position] = entry
+        positions[entry[2]] = position
+    
+    # move an entry towards the leaves
+    def SiftDown(self, position):
+        (items, positions) = (self.items, self.position)
+        entry = items[position]
+        size = len(items)
+        child = 2 * position + 1
+        while(child < size):
+            if(child + 1 < size and items[child + 1] < items[child]):
+                child = child + 1
+            if(entry <= items[child]):
+                break
+            items[position] = items[child]
+            positions[items[position][2]] = position
+            position = child
+            child = 2 * position + 1
+        items[position] = entry
+        positions[entry[2]] = position
+
+
+# bucket queue keyed on f quantized to the resolution, only the bucket holding the smallest key is kept as a heap
+# and every later bucket is a plain list, so most pushes are an append and heap operations stay on a small bucket;
+# entries are still popped in exact (f, g, index) order, so the engine returns the same results as a binary heap
+class BucketQueue(object):
+    # init function
+    def __init__(self, resolution = 1.0):
+        self.scale = 1.0 / resolution
+        self.buckets = {}
+        self.keys = []
+        self.current = []
+        self.currentKey = -1
+        self.size = 0
+    
+    # number of entries, including stale ones
+    def __len__(self):
+        return self.size
+    
+    # insert an entry, entries at or below the active key go straight into the active heap
+    def push(self, entry):
+        self.size = self.size + 1
+        key = int(entry[0] * self.scale)
+        if(key <= self.currentKey):
+            heappush(self.current, entry)
+            return
+        bucket = self.buckets.get(key)
+        if(bucket is None):
+            self.buckets[key] = [entry]
+            heappush(self.keys, key)
+        else:
+            bucket.append(entry)
+    
+    # remove and return the smallest entry, activating the next bucket once the active one runs dry
+    def pop(self):
+        if(len(self.current) == 0):
+            self.currentKey = heappop(self.keys)
+            self.current = self.buckets.pop(self.currentKey)
+            heapify(self.current)
+        self.size = self.size - 1
+        return heappop(self.current)
+
+
+# open list engines selectable on a planner
+OPEN_LISTS = {
+    'heap': HeapQueue,
+    'indexed': IndexedHeap,
+    'bucket': BucketQueue,
+}
@@ -0,0 +1,68 @@
+# header files
+from collections import OrderedDict
+
+
+# estimated bytes of one (row, col) tuple held in a list
+STATE_BYTES = 72
+
+
+# class for a bounded least recently used cache of planner results, keyed by the planner's query key; entries are
+# evicted once there are more than maxEntries of them or their estimated size passes maxBytes, and with
+# keepExplored off the explored states are dropped before a result is stored
+class ResultCache(object):
+    # init function
+    def __init__(self, maxEntries = 1024, maxBytes = 64 * 1024 * 1024, keepExplored = True):
+        self.maxEntries = maxEntries
+        self.maxBytes = maxBytes
+        self.keepExplored = keepExplored
+        self.entries = OrderedDict()
+        self.bytes = 0
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'invalidations': 0}
+
+    # number of cached results
+    def __len__(self):
+        return len(self.entries)
+
+    # estimated size of a result in bytes
+    def Size(self, result):
+        total = 0
+        for part in result[:2]:
+            total = total + (part.nbytes if hasattr(part, 'nbytes') else STATE_BYTES * len(part))
+        return total
+
+    # cached result of a query key or None, a hit makes the entry the most recently used
+    def Get(self, key):
+        entry = self.entries.get(key)
+        if(entry is None):
+            self.stats['misses'] = self.stats['misses'] + 1
+            return None
+        self.entries.move_to_end(key)
+        self.stats['hits'] = self.stats['hits'] + 1
+        return entry[0]
+
+    # store the result of a query key, evicting the least recently used entries past the bounds
+    def Put(self, key, result):
+        if(not self.keepExplored):
+            result = result.WithExplored([])
+        size = self.Size(result)
+        if(size > self.maxBytes):
+            return
+        if(key in self.entries):
+            self.bytes = self.bytes - self.entries.pop(key)[1]
+        self.entries[key] = (result, size)
+        self.bytes = self.bytes + size
+        while(len(self.entries) > self.maxEntries or self.bytes > self.maxBytes):
+            (_, (_, evicted)) = self.entries.popitem(last = False)
+            self.bytes = self.bytes - evicted
+            self.stats['evictions'] = self.stats['evictions'] + 1
+
+    # drop every result of a map, keys start with the map's content hash
+    def Invalidate(self, mapKey):
+        for key in [key for key in self.entries if key[0] == mapKey]:
+            self.bytes = self.bytes - self.entries.pop(key)[1]
+            self.stats['invalidations'] = self.stats['invalidations'] + 1
+
+    # drop everything
+    def Clear(self):
+        self.entries.clear()
+        self.bytes = 0
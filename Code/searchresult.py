@@ -0,0 +1,32 @@
+# class for the result of a query, unpacks as (exploredStates, backtrackStates, distance) like a plain tuple;
+# reason tells why the search ended: 'goal', 'unreachable' when every reachable cell was expanded, or 'deadline',
+# 'budget' and 'cancelled' when it was stopped early; a stopped a-star search leaves the path empty and the distance
+# inf while best, bestPath and bestCost describe the reached cell closest to the goal by the heuristic, and a stopped
+# ARA* search keeps the best path it found so far
+class SearchResult(tuple):
+    # init function
+    def __new__(cls, exploredStates, backtrackStates, distance, reason = 'goal', expansions = 0, best = None, bestPath = None, bestCost = float('inf')):
+        result = tuple.__new__(cls, (exploredStates, backtrackStates, distance))
+        result.reason = reason
+        result.expansions = expansions
+        result.best = best
+        result.bestPath = bestPath
+        result.bestCost = bestCost
+        return result
+
+    # arguments that rebuild the result when it is unpickled
+    def __getnewargs__(self):
+        return tuple(self) + (self.reason, self.expansions, self.best, self.bestPath, self.bestCost)
+
+    # the search ran to its natural end
+    @property
+    def complete(self):
+        return self.reason in ('goal', 'unreachable')
+
+    # same result with other explored states
+    def WithExplored(self, exploredStates):
+        return self.With(exploredStates, self[1])
+
+    # same result with other explored states and another form of the path
+    def With(self, exploredStates, backtrackStates):
+        return SearchResult(exploredStates, backtrackStates, self[2], self.reason, self.expansions, self.best, self.bestPath, self.bestCost)
@@ -1,214 +1,242 @@
-
-
 # header files
+import os
+import time
+import queue
+import threading
+import shutil
+import tempfile
+import multiprocessing
 import numpy as np
 import cv2
-from heapq import heappush, heappop
+from math import sqrt
+from openlist import OPEN_LISTS
+from jps import jps_search
+from bidirectional import bidirectional_search
+from landmarks import Landmarks, landmark_table, map_key
+from anytime import arastar_search
+from searchresult import SearchResult
+from hierarchical import Hierarchy, hpa_search
+from maps import default_map
+from mapcache import MapCache
 
 
-# class for AStar
-class AStar(object):
+# the map planners use unless they are given another one
+DEFAULT_MAP = default_map()
+
+
+# (row, col) direction of every action: left, right, up, down, right down, right up, left up, left down
+ACTIONS = [(0, -1), (0, 1), (-1, 0), (1, 0), (1, 1), (-1, 1), (-1, -1), (1, -1)]
+
+
+# planners, one per (map, clearance, radius), the least recently used is dropped first
+_planners = {}
+
+
+# planners kept by get_planner, each holds its grids, move masks and search arrays
+PLANNER_CACHE = 8
+
+
+# result cache of the planners get_planner hands out, None to plan every query
+_resultCache = None
+
+
+# put a resultcache.ResultCache (or None) in front of every planner get_planner hands out
+def use_result_cache(cache):
+    global _resultCache
+    _resultCache = cache
+    for planner in _planners.values():
+        planner.resultCache = cache
+
+
+# shared planner for a robot footprint on a map (the default map when none is given), built on first use and kept
+# while it is among the PLANNER_CACHE most recently used
+def get_planner(clearance, radius, worldMap = None):
+    worldMap = worldMap if worldMap is not None else DEFAULT_MAP
+    key = (worldMap, clearance, radius)
+    planner = _planners.pop(key, None)
+    if(planner is None):
+        planner = Planner(clearance, radius, worldMap = worldMap, resultCache = _resultCache)
+        if(len(_planners) >= PLANNER_CACHE):
+            del _planners[next(iter(_planners))]
+    _planners[key] = planner
+    planner.Sync()
+    return planner
+
+
+# expansions between two checks of the deadline and the cancel token
+CHECK_INTERVAL = 256
+
+
+# class for a planner that answers many queries on one map and footprint; without a map it plans on the default
+# obstacles on a numRows x numCols canvas, and an obstacles grid, when given, is used instead of rasterizing the map
+class Planner(object):
     # init function
-    def __init__(self, start, goal, clearance, radius, stepSize):
-        self.start = start
-        self.goal = goal
-        self.numRows = 200
-        self.numCols = 300
-        self.stepSize = stepSize
+    def __init__(self, clearance, radius, numRows = None, numCols = None, obstacles = None, openList = 'heap', mode = 'astar', heuristic = 'euclidean', landmarkCount = 8, landmarkPath = None, weight = 1.0, weightStep = 0.5, timeLimit = None, clusterSize = 32, worldMap = None, resultCache = None, record = 'list', pathArray = False):
+        if(openList not in OPEN_LISTS):
+            raise ValueError("unknown open list " + repr(openList) + ", expected one of " + ", ".join(sorted(OPEN_LISTS)))
+        if(mode not in SEARCH_MODES):
+            raise ValueError("unknown search mode " + repr(mode) + ", expected one of " + ", ".join(sorted(SEARCH_MODES)))
+        if(heuristic not in HEURISTICS):
+            raise ValueError("unknown heuristic " + repr(heuristic) + ", expected one of " + ", ".join(HEURISTICS))
+        if(record not in RECORDS):
+            raise ValueError("unknown record " + repr(record) + ", expected one of " + ", ".join(RECORDS))
+        if(worldMap is None and numRows in (None, DEFAULT_MAP.numRows) and numCols in (None, DEFAULT_MAP.numCols)):
+            worldMap = DEFAULT_MAP
+        elif(worldMap is None):
+            worldMap = default_map(numRows if numRows is not None else DEFAULT_MAP.numRows, numCols if numCols is not None else DEFAULT_MAP.numCols)
+        self.map = worldMap
+        self.numRows = worldMap.numRows
+        self.numCols = worldMap.numCols
         self.clearance = clearance
         self.radius = radius
-        self.graph = {}
-        self.distance = {}
-        self.path = {}
-        self.costToCome = {}
-        self.costToGo = {}
-        self.visited = {}
+        self.numCells = self.numRows * self.numCols
+        self.actions = ACTIONS
+        self.actionCost = [1, 1, 1, 1, 1.414, 1.414, 1.414, 1.414]
+        self.obstacles = obstacles if obstacles is not None else worldMap.Grid(clearance + radius)
+        self.mapVersion = worldMap.version if obstacles is None else None
+        self.moves = {}
+        self.jumpTables = {}
+        self.openList = openList
+        self.mode = mode
+        self.heuristic = heuristic
+        self.landmarkCount = landmarkCount
+        self.landmarkPath = landmarkPath
+        self.landmarks = None
+        self.weight = weight
+        self.weightStep = weightStep
+        self.timeLimit = timeLimit
+        self.clusterSize = clusterSize
+        self.hierarchy = None
+        self.resultCache = resultCache
+        self.freeKey = None
+        self.record = record
+        self.pathArray = pathArray
+        self.order = None
+        self.stats = {}
+        self.goal = None
+        self.stepSize = 1
+        
+        # search state keyed by flat cell index, a cell whose stamp is the current generation is open and
+        # one stamped generation + 1 is closed, anything older is stale so starting a query costs nothing
+        # (the f-value only lives in the heap entries, the float32 scratch slot rounds candidate costs for comparison)
+        self.costToCome = np.empty(self.numCells, dtype=np.float32)
+        self.rounding = np.empty(1, dtype=np.float32)
+        self.path = np.empty(self.numCells, dtype=np.int32)
+        self.stamp = np.zeros(self.numCells, dtype=np.uint32)
+        self.stampArrays = [self.stamp]
+        self.reverseState = None
+        self.generation = 0
         
-        for row in range(1, self.numRows + 1):
-            for col in range(1, self.numCols + 1):
-                self.visited[(row, col)] = False
-                self.path[(row, col)] = -1
-                self.graph[(row, col)] = [1, 1, 1, 1, 1.414, 1.414, 1.414, 1.414]
-                self.costToCome[(row, col)] = float('inf')
-                self.costToGo[(row, col)] = float('inf')
-                self.distance[(row, col)] = float('inf')
+        # memoryviews give fast scalar access in the search loop
+        self._costToCome = memoryview(self.costToCome)
+        self._rounding = memoryview(self.rounding)
+        self._path = memoryview(self.path)
+        self._stamp = memoryview(self.stamp)
+        
+        self.free = self.FreeGrid()
+    
+    # cells a move may end on, inside the clearance margin and not an obstacle
+    def FreeGrid(self):
+        margin = self.radius + self.clearance
+        rows = np.arange(1, self.numRows + 1).reshape(-1, 1)
+        cols = np.arange(1, self.numCols + 1).reshape(1, -1)
+        return (rows >= 1 + margin) & (rows <= self.numRows - margin) & (cols >= 1 + margin) & (cols <= self.numCols - margin) & ~self.obstacles
+    
+    # mark cells blocked or free, patching the cached move masks around them and dropping the caches that were
+    # built from the old grid; a planner from get_planner is shared, so only change cells on one built for the caller
+    def UpdateCells(self, cells, blocked):
+        for (row, col) in cells:
+            self.free[row - 1, col - 1] = not blocked
+        for (stepSize, (_, moves, _)) in self.moves.items():
+            for (row, col) in cells:
+                for (bit, (dRow, dCol)) in enumerate(ACTIONS):
+                    (sourceRow, sourceCol) = (row - 1 - dRow * stepSize, col - 1 - dCol * stepSize)
+                    if(0 <= sourceRow < self.numRows and 0 <= sourceCol < self.numCols):
+                        index = sourceRow * self.numCols + sourceCol
+                        moves[index] = (moves[index] & (255 ^ (1 << bit))) | ((not blocked) << bit)
+        self.jumpTables = {}
+        self.landmarks = None
+        if(self.hierarchy is not None):
+            self.hierarchy.Invalidate(cells)
+        if(self.resultCache is not None and self.freeKey is not None):
+            self.resultCache.Invalidate(self.freeKey)
+        self.freeKey = None
+    
+    # switch to another robot footprint, only the cells whose occupancy differs are updated;
+    # returns the (row, col) cells that became blocked and those that became free
+    def SetFootprint(self, clearance, radius):
+        self.clearance = clearance
+        self.radius = radius
+        self.obstacles = self.map.Grid(clearance + radius)
+        self.mapVersion = self.map.version
+        free = self.FreeGrid()
+        blocked = [(row + 1, col + 1) for (row, col) in zip(*np.nonzero(self.free & ~free))]
+        freed = [(row + 1, col + 1) for (row, col) in zip(*np.nonzero(free & ~self.free))]
+        self.UpdateCells(blocked, True)
+        self.UpdateCells(freed, False)
+        return (blocked, freed)
+    
+    # catch up with obstacles added to the map since its grid was taken, only the cells that changed are updated
+    # and the cached results of the old cells are invalidated; planners given their own obstacles never change
+    def Sync(self):
+        if(self.mapVersion is not None and self.mapVersion != self.map.version):
+            self.SetFootprint(self.clearance, self.radius)
+    
+    # start a new query by bumping the generation, the stamps are only cleared when the counter wraps
+    def Reset(self):
+        self.generation = self.generation + 2
+        if(self.generation >= 0xFFFFFFFE):
+            for stamp in self.stampArrays:
+                stamp.fill(0)
+            self.generation = 2
+    
+    # flat index of a cell
+    def Index(self, row, col):
+        return (row - 1) * self.numCols + (col - 1)
+    
+    # cell of a flat index
+    def Cell(self, index):
+        (row, col) = divmod(index, self.numCols)
+        return (row + 1, col + 1)
     
     # move is valid 
     def IsValid(self, currRow, currCol):
         return (currRow >= (1 + self.radius + self.clearance) and currRow <= (self.numRows - self.radius - self.clearance) and currCol >= (1 + self.radius + self.clearance) and currCol <= (self.numCols - self.radius - self.clearance))
     
-    # checks for an obstacle
+    # checks for an obstacle on the planner's own cells, so cells given as obstacles or changed by UpdateCells count;
+    # inside the clearance margin, where no cell is free, it falls back to the obstacle grid and off the map it is False
     def IsObstacle(self, row, col):
-        # constants
-        sum_of_c_and_r = self.clearance + self.radius
-        sqrt_of_c_and_r = 1.4142 * sum_of_c_and_r
-        
-        # check circle
-        dist1 = ((row - 150) * (row - 150) + (col - 225) * (col - 225)) - ((25 + sum_of_c_and_r) * (25 + sum_of_c_and_r))
-        
-        # check eclipse
-        dist2 = ((((row - 100) * (row - 100)) / ((20 + sum_of_c_and_r) * (20 + sum_of_c_and_r))) + (((col - 150) * (col - 150)) / ((40 + sum_of_c_and_r) * (40 + sum_of_c_and_r)))) - 1
-        
-        # check triangles
-        (x1, y1) = (120 - (2.62 * sum_of_c_and_r), 20 - (1.205 * sum_of_c_and_r))
-        (x2, y2) = (150 - sqrt_of_c_and_r, 50)
-        (x3, y3) = (185 + sum_of_c_and_r, 25 - (sum_of_c_and_r * 0.9247))
-        first = ((col - y1) * (x2 - x1)) - ((y2 - y1) * (row - x1))
-        second = ((col - y2) * (x3 - x2)) - ((y3 - y2) * (row - x2))
-        third = ((col - y3) * (x1 - x3)) - ((y1 - y3) * (row - x3))
-        dist3 = 1
-        if(first <= 0 and second <= 0 and third <= 0):
-            dist3 = 0
-            
-        (x1, y1) = (150 - sqrt_of_c_and_r, 50)
-        (x2, y2) = (185 + sum_of_c_and_r, 25 - (sum_of_c_and_r * 0.9247))
-        (x3, y3) = (185 + sum_of_c_and_r, 75 + (sum_of_c_and_r * 0.714))
-        first = ((col - y1) * (x2 - x1)) - ((y2 - y1) * (row - x1))
-        second = ((col - y2) * (x3 - x2)) - ((y3 - y2) * (row - x2))
-        third = ((col - y3) * (x1 - x3)) - ((y1 - y3) * (row - x3))
-        dist4 = 1
-        if(first >= 0 and second >= 0 and third >= 0):
-            dist4 = 0
-        
-        # check rhombus
-        (x1, y1) = (10 - sqrt_of_c_and_r, 225)
-        (x2, y2) = (25, 200 - sqrt_of_c_and_r)
-        (x3, y3) = (40 + sqrt_of_c_and_r, 225)
-        (x4, y4) = (25, 250 + sqrt_of_c_and_r)
-        first = ((col - y1) * (x2 - x1)) - ((y2 - y1) * (row - x1))
-        second = ((col - y2) * (x3 - x2)) - ((y3 - y2) * (row - x2))
-        third = ((col - y3) * (x4 - x3)) - ((y4 - y3) * (row - x3))
-        fourth = ((col - y4) * (x1 - x4)) - ((y1 - y4) * (row - x4))
-        dist5 = 1
-        dist6 = 1
-        if(first >= 0 and second >= 0 and third >= 0 and fourth >= 0):
-            dist5 = 0
-            dist6 = 0
-        
-        # check square
-        (x1, y1) = (150 - sqrt_of_c_and_r, 50)
-        (x2, y2) = (120 - sqrt_of_c_and_r, 75)
-        (x3, y3) = (150, 100 + sqrt_of_c_and_r)
-        (x4, y4) = (185 + sum_of_c_and_r, 75 + (sum_of_c_and_r * 0.714))
-        first = ((col - y1) * (x2 - x1)) - ((y2 - y1) * (row - x1))
-        second = ((col - y2) * (x3 - x2)) - ((y3 - y2) * (row - x2))
-        third = ((col - y3) * (x4 - x3)) - ((y4 - y3) * (row - x3))
-        fourth = ((col - y4) * (x1 - x4)) - ((y1 - y4) * (row - x4))
-        dist7 = 1
-        dist8 = 1
-        if(first <= 0 and second <= 0 and third <= 0 and fourth <= 0):
-            dist7 = 0
-            dist8 = 0
-        
-        # check rod
-        first = ((col - 95) * (8.66 + sqrt_of_c_and_r)) - ((5 + sqrt_of_c_and_r) * (row - 30 + sqrt_of_c_and_r))
-        second = ((col - 95) * (37.5 + sqrt_of_c_and_r)) - ((-64.95 - sqrt_of_c_and_r) * (row - 30 + sqrt_of_c_and_r))
-        third = ((col - 30.05 + sqrt_of_c_and_r) * (8.65 + sqrt_of_c_and_r)) - ((5.45 + sqrt_of_c_and_r) * (row - 67.5))
-        fourth = ((col - 35.5) * (-37.49 - sqrt_of_c_and_r)) - ((64.5 + sqrt_of_c_and_r) * (row - 76.15 - sqrt_of_c_and_r))
-        dist9 = 1
-        dist10 = 1
-        if(first <= 0 and second >= 0 and third >= 0 and fourth >= 0):
-            dist9 = 0
-            dist10 = 0
-        
-        if(dist1 <= 0 or dist2 <= 0 or dist3 == 0 or dist4 == 0 or dist5 == 0 or dist6 == 0 or dist7 == 0 or dist8 == 0 or dist9 == 0 or dist10 == 0):
-            return True
-        return False
-    
-    # action move left
-    def ActionMoveLeft(self, currRow, currCol):
-        if(self.IsValid(currRow, currCol - self.stepSize) and self.IsObstacle(currRow, currCol - self.stepSize) == False and self.visited[(currRow, currCol - self.stepSize)] == False):
-            return True
-        return False
-
-    # action move right
-    def ActionMoveRight(self, currRow, currCol):
-        if(self.IsValid(currRow, currCol + self.stepSize) and self.IsObstacle(currRow, currCol + self.stepSize) == False and self.visited[(currRow, currCol + self.stepSize)] == False):
-            return True
-        return False
-
-    # action move up
-    def ActionMoveUp(self, currRow, currCol):
-        if(self.IsValid(currRow - self.stepSize, currCol) and self.IsObstacle(currRow - self.stepSize, currCol) == False and self.visited[(currRow - self.stepSize, currCol)] == False):
-            return True
-        return False
-
-    # action move down
-    def ActionMoveDown(self, currRow, currCol):
-        if(self.IsValid(currRow + self.stepSize, currCol) and self.IsObstacle(currRow + self.stepSize, currCol) == False and self.visited[(currRow + self.stepSize, currCol)] == False):
-            return True
-        return False
-
-    # action move right up
-    def ActionMoveRightUp(self, currRow, currCol):
-        if(self.IsValid(currRow - self.stepSize, currCol + self.stepSize) and self.IsObstacle(currRow - self.stepSize, currCol + self.stepSize) == False and self.visited[(currRow - self.stepSize, currCol + self.stepSize)] == False):
-            return True
-        return False
-
-    # action move right down
-    def ActionMoveRightDown(self, currRow, currCol):
-        if(self.IsValid(currRow + self.stepSize, currCol + self.stepSize) and self.IsObstacle(currRow + self.stepSize, currCol + self.stepSize) == False and self.visited[(currRow + self.stepSize, currCol + self.stepSize)] == False):
-            return True
-        return False
-
-    # action move left down
-    def ActionMoveLeftDown(self, currRow, currCol):
-        if(self.IsValid(currRow + self.stepSize, currCol - self.stepSize) and self.IsObstacle(currRow + self.stepSize, currCol - self.stepSize) == False and self.visited[(currRow + self.stepSize, currCol - self.stepSize)] == False):
-            return True
-        return False
-
-    # action move left up
-    def ActionMoveLeftUp(self, currRow, currCol):
-        if(self.IsValid(currRow - self.stepSize, currCol - self.stepSize) and self.IsObstacle(currRow - self.stepSize, currCol - self.stepSize) == False and self.visited[(currRow - self.stepSize, currCol - self.stepSize)] == False):
-            return True
-        return False
-    
-    # update action
-    def UpdateAction(self, currentNode, weight, newRow, newCol):
-        new_cost_to_come = self.costToCome[currentNode] + weight
-        new_cost_to_go = self.euc_heuristic(newRow, newCol)
-        new_distance = new_cost_to_come + new_cost_to_go
-                
-        if(self.distance[(newRow, newCol)] > new_distance):
-            self.distance[(newRow, newCol)] = new_distance
-            self.costToCome[(newRow, newCol)] = new_cost_to_come
-            self.costToGo[(newRow, newCol)] = new_cost_to_go
-            self.path[(newRow, newCol)] = currentNode
-            return True
-        return False
-
-    # animate path
-    def animate(self, explored_states, backtrack_states, path):
-        fourcc = cv2.VideoWriter_fourcc(*'XVID')
-        out = cv2.VideoWriter(str(path), fourcc, 20.0, (self.numCols, self.numRows))
-        image = np.zeros((self.numRows, self.numCols, 3), dtype=np.uint8)
-        count = 0
-        for state in explored_states:
-            image[self.numRows - state[0], state[1] - 1] = (255, 255, 0)
-            if(count%80 == 0):
-                out.write(image)
-            count = count + 1
-
-        count = 0
-        for row in range(1, self.numRows + 1):
-            for col in range(1, self.numCols + 1):
-                if(image[self.numRows - row, col - 1, 0] == 0 and image[self.numRows - row, col - 1, 1] == 0 and image[self.numRows - row, col - 1, 2] == 0):
-                    if(self.IsValid(row, col) and self.IsObstacle(row, col) == False):
-                        image[self.numRows - row, col - 1] = (255, 255, 255)
-                        if(count%80 == 0):
-                            out.write(image)
-                        count = count + 1
-            
-        if(len(backtrack_states) > 0):
-            for state in backtrack_states:
-                image[self.numRows - state[0], state[1] - 1] = (0, 0, 255)
-                out.write(image)
-                cv2.imshow('result', image)
-                cv2.waitKey(5)
-                
-        cv2.waitKey(0)
-        cv2.destroyAllWindows()
-        out.release()
+        self.Sync()
+        if(row < 1 or row > self.numRows or col < 1 or col > self.numCols):
+            return False
+        if(self.IsValid(row, col)):
+            return not self.free[row - 1, col - 1]
+        return bool(self.obstacles[row - 1, col - 1])
+    
+    # neighbour table for a step size, built once per planner: a per-cell bitmask of the moves that land on a
+    # free cell, and for every mask value the (flat offset, cost) pairs it selects
+    def Moves(self, stepSize):
+        moves = self.moves.get(stepSize)
+        if(moves is None):
+            mask = np.zeros((self.numRows, self.numCols), dtype=np.uint8)
+            offsets = []
+            for (bit, (dRow, dCol)) in enumerate(ACTIONS):
+                (dRow, dCol) = (dRow * stepSize, dCol * stepSize)
+                offsets.append(dRow * self.numCols + dCol)
+                if(abs(dRow) >= self.numRows or abs(dCol) >= self.numCols):
+                    continue
+                target = self.free[max(dRow, 0):self.numRows + min(dRow, 0), max(dCol, 0):self.numCols + min(dCol, 0)]
+                source = mask[max(-dRow, 0):self.numRows + min(-dRow, 0), max(-dCol, 0):self.numCols + min(-dCol, 0)]
+                source |= target.astype(np.uint8) << bit
+            table = [tuple((offsets[bit], self.actionCost[bit]) for bit in range(len(ACTIONS)) if (value >> bit) & 1) for value in range(256)]
+            mask = mask.reshape(-1)
+            moves = (mask, memoryview(mask), table)
+            self.moves[stepSize] = moves
+        return moves
+    
+    # empty open list of the configured engine
+    def NewOpenList(self):
+        return OPEN_LISTS[self.openList]()
     
     # diagonal heuristic
     def diagonal_heuristic(self, row, col, weight = 1.0):
@@ -218,78 +246,474 @@ class AStar(object):
     def euc_heuristic(self, row, col, weight = 1.0):
         return weight * np.sqrt((((self.goal[0] - row) / self.stepSize)**2) + (((self.goal[1] - col) / self.stepSize)**2))
     
+    # landmark tables for this planner, built or loaded on first use; without a landmarkPath they are kept
+    # memory-mapped in the map's cache when it has one
+    def LoadLandmarks(self):
+        if(self.landmarks is None):
+            self.landmarks = landmark_table(self, self.landmarkCount, self.landmarkPath, self.map.cache)
+        return self.landmarks
+    
+    # cluster graph for the hierarchical search mode, built on first use
+    def LoadHierarchy(self):
+        if(self.hierarchy is None):
+            self.hierarchy = Hierarchy(self, self.clusterSize)
+        return self.hierarchy
+    
+    # cost-to-go function for the a-star search, None for the euclidean heuristic which the search loop inlines;
+    # landmark tables only cover step size 1 and are built (or loaded from landmarkPath) on first use
+    def Heuristic(self, goal, stepSize):
+        if(self.heuristic != 'landmarks' or stepSize != 1):
+            return None
+        self.LoadLandmarks()
+        (goalRow, goalCol) = (goal[0] - 1, goal[1] - 1)
+        (straight, diagonal) = (self.actionCost[0], self.actionCost[4])
+        numCols = self.numCols
+        
+        # octile distance, admissible with the 1.414 diagonal cost
+        def octile(index):
+            (row, col) = divmod(index, numCols)
+            (dRow, dCol) = (abs(goalRow - row), abs(goalCol - col))
+            return diagonal * min(dRow, dCol) + straight * abs(dRow - dCol)
+        return self.landmarks.bound(self.Index(goal[0], goal[1]), octile)
+    
+    # settings a copy of this planner needs to answer queries the same way
+    def Options(self):
+        return {'openList': self.openList, 'mode': self.mode, 'heuristic': self.heuristic, 'landmarkCount': self.landmarkCount, 'landmarkPath': self.landmarkPath,
+                'weight': self.weight, 'weightStep': self.weightStep, 'timeLimit': self.timeLimit, 'clusterSize': self.clusterSize,
+                'record': self.record, 'pathArray': self.pathArray}
+    
+    # answer a query with the configured search mode; a wall-clock deadline (a time.time() value), a budget of
+    # expansions and a cancel token (anything with is_set(), such as a threading.Event) bound the a-star mode,
+    # results of searches stopped early are never cached
+    def plan(self, start, goal, stepSize, deadline = None, maxExpansions = None, cancel = None):
+        self.Sync()
+        if(self.mode == 'astar'):
+            run = lambda: self.search(start, goal, stepSize, deadline, maxExpansions, cancel)
+        elif(deadline is not None or maxExpansions is not None or cancel is not None):
+            raise ValueError("deadlines, budgets and cancellation need the astar search mode, not " + repr(self.mode))
+        else:
+            run = lambda: SEARCH_MODES[self.mode](self, start, goal, stepSize)
+        if(self.resultCache is None):
+            return self.Output(run())
+        key = self.QueryKey(start, goal, stepSize)
+        result = self.resultCache.Get(key)
+        if(result is not None):
+            self.stats = {'expansions': 0, 'pushes': 0, 'stale': 0, 'open': 0, 'cached': True}
+            return result
+        result = self.Output(run())
+        if(result.complete):
+            self.resultCache.Put(key, result)
+        return result
+    
+    # bring a search mode's result into the configured record and path formats; the a-star search produces them
+    # directly, the other modes build lists that are converted here
+    def Output(self, result):
+        (exploredStates, backtrackStates, distance) = result
+        if(isinstance(exploredStates, list) and self.record != 'list'):
+            if(self.record == 'none'):
+                exploredStates = []
+            elif(self.record == 'array'):
+                exploredStates = np.array([state[:2] for state in exploredStates], dtype=np.int32).reshape(-1, 2)
+            else:
+                bitmap = np.zeros((self.numRows, self.numCols), dtype=np.bool_)
+                for state in exploredStates:
+                    bitmap[state[0] - 1, state[1] - 1] = True
+                exploredStates = bitmap
+        if(self.pathArray and isinstance(backtrackStates, list)):
+            backtrackStates = np.array(backtrackStates, dtype=np.int32).reshape(-1, 2)
+        if(isinstance(result, SearchResult)):
+            return result.With(exploredStates, backtrackStates)
+        return SearchResult(exploredStates, backtrackStates, distance, 'goal' if distance != float('inf') else 'unreachable', self.stats.get('expansions', 0))
+    
+    # explored states of the last a-star search in the configured record format: a list of (row, col), an empty
+    # list, an (N, 2) int32 array of cells in expansion order, or a (numRows, numCols) bitmap of the closed cells
+    def Explored(self, exploredStates, expansions):
+        if(self.record == 'array'):
+            order = self.order[:expansions]
+            return np.stack((order // self.numCols + 1, order % self.numCols + 1), axis = 1).astype(np.int32)
+        if(self.record == 'bitmap'):
+            return (self.stamp == self.generation + 1).reshape(self.numRows, self.numCols)
+        return exploredStates
+    
+    # result cache key of a query: a content hash of the free cells (kept until cells change), the footprint,
+    # the settings and the query itself; cached results are shared, so callers must not modify them
+    def QueryKey(self, start, goal, stepSize):
+        if(self.freeKey is None):
+            self.freeKey = map_key(self)
+        return (self.freeKey, self.radius, self.clearance, stepSize, tuple(start), tuple(goal), tuple(sorted(self.Options().items())))
+    
     # a-star algo
-    def search(self):
+    def search(self, start, goal, stepSize, deadline = None, maxExpansions = None, cancel = None):
+        for (_, result) in self.iter_search(start, goal, stepSize, None, deadline, maxExpansions, cancel):
+            pass
+        return result
+    
+    # path from the start to a reached cell in the configured path format, as a list of (row, col) or an (N, 2) array
+    def Backtrack(self, index):
+        cells = []
+        while(index != -1):
+            cells.append(index if self.pathArray else self.Cell(index))
+            index = self._path[index]
+        cells.reverse()
+        if(self.pathArray):
+            indices = np.array(cells, dtype=np.int32)
+            return np.stack((indices // self.numCols + 1, indices % self.numCols + 1), axis = 1)
+        return cells
+    
+    # sum of the step costs along a path
+    def PathCost(self, cells):
+        steps = np.abs(np.diff(np.asarray(cells, dtype=np.int64).reshape(-1, 2), axis = 0))
+        diagonal = np.count_nonzero((steps[:, 0] > 0) & (steps[:, 1] > 0))
+        return float(self.actionCost[0] * (len(steps) - diagonal) + self.actionCost[4] * diagonal)
+    
+    # why a bounded search has to stop now, None to go on
+    def StopReason(self, expansions, deadline, maxExpansions, cancel):
+        if(maxExpansions is not None and expansions >= maxExpansions):
+            return 'budget'
+        if(cancel is not None and cancel.is_set()):
+            return 'cancelled'
+        if(deadline is not None and time.time() > deadline):
+            return 'deadline'
+        return None
+    
+    # cells expanded since the last batch in the configured record format, the none and bitmap formats
+    # only report progress through stats
+    def Batch(self, exploredStates, first, last):
+        if(self.record == 'list'):
+            return exploredStates[first:last]
+        if(self.record == 'array'):
+            order = self.order[first:last]
+            return np.stack((order // self.numCols + 1, order % self.numCols + 1), axis = 1).astype(np.int32)
+        return []
+    
+    # a-star as a generator: yields (batch, None) after every batchSize expansions with the cells expanded since
+    # the previous batch, and finally (batch, result) with the SearchResult search returns; stats are kept current
+    # at every batch ('open' counts heap entries, stale ones included, and 'frontier' the open cells), the consumer may stop pulling at any point, and starting another query on the planner ends a
+    # search in progress, as they share the search state; the planner's timeLimit sets the deadline when none is given,
+    # the budget is checked on every expansion and the deadline and cancel token every CHECK_INTERVAL expansions
+    def iter_search(self, start, goal, stepSize, batchSize = 256, deadline = None, maxExpansions = None, cancel = None):
+        if(deadline is None and self.timeLimit is not None):
+            deadline = time.time() + self.timeLimit
+        self.Sync()
         # mark source node and create a queue
+        self.Reset()
+        self.goal = goal
+        self.stepSize = stepSize
         exploredStates = []
-        queue = []
-        self.costToCome[self.start] = 0
-        self.costToGo[self.start] = self.euc_heuristic(self.start[0], self.start[1])
-        self.distance[self.start] = self.costToCome[self.start] + self.costToGo[self.start]
-        heappush(queue, (self.distance[self.start], self.costToCome[self.start], self.start))
+        (recordList, recordOrder) = (self.record == 'list', self.record == 'array')
+        if(recordOrder and self.order is None):
+            self.order = np.empty(self.numCells, dtype=np.int32)
+        order = memoryview(self.order) if recordOrder else None
+        expansions = 0
+        queue = self.NewOpenList()
+        (push, pop) = (queue.push, queue.pop)
+        startIndex = self.Index(start[0], start[1])
+        goalIndex = self.Index(self.goal[0], self.goal[1])
+        self._stamp[startIndex] = self.generation
+        self._costToCome[startIndex] = 0
+        self._path[startIndex] = -1
+        heuristic = self.Heuristic(goal, stepSize)
+        epsilon = self.weight
+        infinity = float('inf')
+        
+        # an infinite landmark bound proves the goal unreachable, such cells are never queued
+        startCostToGo = self.euc_heuristic(start[0], start[1]) if heuristic is None else heuristic(startIndex)
+        if(startCostToGo != infinity):
+            push((epsilon * startCostToGo, 0.0, startIndex))
+        
+        # locals for the search loop
+        (_, moves, table) = self.Moves(stepSize)
+        (stamps, costs, parents, rounding) = (self._stamp, self._costToCome, self._path, self._rounding)
+        (generation, closed) = (self.generation, self.generation + 1)
+        (numCols, goalRow, goalCol) = (self.numCols, self.goal[0] - 1, self.goal[1] - 1)
+        (pushes, stale) = (1, 0)
+        opened = 1 if len(queue) > 0 else 0
+        (batchStart, batchEnd) = (0, batchSize if batchSize is not None else -1)
+        timed = deadline is not None or cancel is not None
+        checkAt = 0 if timed else -1
+        if(maxExpansions is not None and (checkAt == -1 or maxExpansions < checkAt)):
+            checkAt = maxExpansions
+        (reason, bestIndex, bestCostToGo) = ('unreachable', startIndex, float('inf'))
         
         # run a-star
+        distance = float('inf')
         while(len(queue) > 0):
-            # get current node
-            _, _, currentNode = heappop(queue)
-            self.visited[currentNode] = True
-            exploredStates.append(currentNode)
+            # stop a bounded search once its budget, deadline or cancel token says so, checked before the next
+            # expansion so a budget of n expands at most n cells
+            if(expansions == checkAt):
+                stop = self.StopReason(expansions, deadline, maxExpansions, cancel)
+                if(stop is not None):
+                    reason = stop
+                    break
+                checkAt = expansions + CHECK_INTERVAL if timed else -1
+                if(maxExpansions is not None and (checkAt == -1 or maxExpansions < checkAt)):
+                    checkAt = maxExpansions
+            
+            # get current node, skipping entries left behind by a cheaper push of the same cell
+            _, costToCome, currentIndex = pop()
+            if(stamps[currentIndex] == closed):
+                stale = stale + 1
+                continue
+            stamps[currentIndex] = closed
+            if(recordList):
+                exploredStates.append(self.Cell(currentIndex))
+            elif(recordOrder):
+                order[expansions] = currentIndex
+            expansions = expansions + 1
             
             # if goal node then break
-            if(currentNode[0] == self.goal[0] and currentNode[1] == self.goal[1]):
+            if(currentIndex == goalIndex):
+                distance = costToCome
+                reason = 'goal'
                 break
                
-            # traverse the edges
-            if(self.ActionMoveLeft(currentNode[0], currentNode[1])):
-                updateHeap = self.UpdateAction(currentNode, self.graph[currentNode][0], currentNode[0], currentNode[1] - self.stepSize)
-                if(updateHeap):
-                    heappush(queue, (self.distance[(currentNode[0], currentNode[1] - self.stepSize)], self.costToCome[(currentNode[0], currentNode[1] - self.stepSize)], (currentNode[0], currentNode[1] - self.stepSize)))
+            # traverse the edges, bounds and occupancy are already folded into the move mask
+            for (offset, weight) in table[moves[currentIndex]]:
+                index = currentIndex + offset
+                stamp = stamps[index]
+                if(stamp == closed):
+                    continue
+                new_cost_to_come = costToCome + weight
+                rounding[0] = new_cost_to_come
+                if(stamp != generation or costs[index] > rounding[0]):
+                    stamps[index] = generation
+                    costs[index] = new_cost_to_come
+                    parents[index] = currentIndex
+                    if(heuristic is None):
+                        (newRow, newCol) = divmod(index, numCols)
+                        new_cost_to_go = sqrt((((goalRow - newRow) / stepSize) ** 2) + (((goalCol - newCol) / stepSize) ** 2))
+                    else:
+                        new_cost_to_go = heuristic(index)
+                        if(new_cost_to_go == infinity):
+                            continue
+                    if(stamp != generation):
+                        opened = opened + 1
+                    push((new_cost_to_come + epsilon * new_cost_to_go, new_cost_to_come, index))
+                    pushes = pushes + 1
+                    if(new_cost_to_go < bestCostToGo):
+                        (bestIndex, bestCostToGo) = (index, new_cost_to_go)
             
-            if(self.ActionMoveRight(currentNode[0], currentNode[1])):
-                updateHeap = self.UpdateAction(currentNode, self.graph[currentNode][1], currentNode[0], currentNode[1] + self.stepSize)
-                if(updateHeap):
-                    heappush(queue, (self.distance[(currentNode[0], currentNode[1] + self.stepSize)], self.costToCome[(currentNode[0], currentNode[1] + self.stepSize)], (currentNode[0], currentNode[1] + self.stepSize)))
-                    
-            if(self.ActionMoveUp(currentNode[0], currentNode[1])):
-                updateHeap = self.UpdateAction(currentNode, self.graph[currentNode][2], currentNode[0] - self.stepSize, currentNode[1])
-                if(updateHeap):
-                    heappush(queue, (self.distance[(currentNode[0] - self.stepSize, currentNode[1])], self.costToCome[(currentNode[0] - self.stepSize, currentNode[1])], (currentNode[0] - self.stepSize, currentNode[1])))
-                    
-            if(self.ActionMoveDown(currentNode[0], currentNode[1])):
-                updateHeap = self.UpdateAction(currentNode, self.graph[currentNode][3], currentNode[0] + self.stepSize, currentNode[1])
-                if(updateHeap):
-                    heappush(queue, (self.distance[(currentNode[0] + self.stepSize, currentNode[1])], self.costToCome[(currentNode[0] + self.stepSize, currentNode[1])], (currentNode[0] + self.stepSize, currentNode[1])))
-                    
-            if(self.ActionMoveRightDown(currentNode[0], currentNode[1])):
-                updateHeap = self.UpdateAction(currentNode, self.graph[currentNode][4], currentNode[0] + self.stepSize, currentNode[1] + self.stepSize)
-                if(updateHeap):
-                    heappush(queue, (self.distance[(currentNode[0] + self.stepSize, currentNode[1] + self.stepSize)], self.costToCome[(currentNode[0] + self.stepSize, currentNode[1] + self.stepSize)], (currentNode[0] + self.stepSize, currentNode[1] + self.stepSize)))
-                    
-            if(self.ActionMoveRightUp(currentNode[0], currentNode[1])):
-                updateHeap = self.UpdateAction(currentNode, self.graph[currentNode][5], currentNode[0] - self.stepSize, currentNode[1] + self.stepSize)
-                if(updateHeap):
-                    heappush(queue, (self.distance[(currentNode[0] - self.stepSize, currentNode[1] + self.stepSize)], self.costToCome[(currentNode[0] - self.stepSize, currentNode[1] + self.stepSize)], (currentNode[0] - self.stepSize, currentNode[1] + self.stepSize)))
-                    
-            if(self.ActionMoveLeftUp(currentNode[0], currentNode[1])):
-                updateHeap = self.UpdateAction(currentNode, self.graph[currentNode][6], currentNode[0] - self.stepSize, currentNode[1] - self.stepSize)
-                if(updateHeap):
-                    heappush(queue, (self.distance[(currentNode[0] - self.stepSize, currentNode[1] - self.stepSize)], self.costToCome[(currentNode[0] - self.stepSize, currentNode[1] - self.stepSize)], (currentNode[0] - self.stepSize, currentNode[1] - self.stepSize)))
-                    
-            if(self.ActionMoveLeftDown(currentNode[0], currentNode[1])):
-                updateHeap = self.UpdateAction(currentNode, self.graph[currentNode][7], currentNode[0] + self.stepSize, currentNode[1] - self.stepSize)
-                if(updateHeap):
-                    heappush(queue, (self.distance[(currentNode[0] + self.stepSize, currentNode[1] - self.stepSize)], self.costToCome[(currentNode[0] + self.stepSize, currentNode[1] - self.stepSize)], (currentNode[0] + self.stepSize, currentNode[1] - self.stepSize)))
+            # hand the batch to the consumer
+            if(expansions == batchEnd):
+                self.stats = {'expansions': expansions, 'pushes': pushes, 'stale': stale, 'open': len(queue), 'frontier': opened - expansions}
+                yield (self.Batch(exploredStates, batchStart, batchEnd), None)
+                (batchStart, batchEnd) = (batchEnd, batchEnd + batchSize)
+        
+        self.stats = {'expansions': expansions, 'pushes': pushes, 'stale': stale, 'open': len(queue), 'frontier': opened - expansions}
+        batch = self.Batch(exploredStates, batchStart, expansions) if batchSize is not None else []
+        exploredStates = self.Explored(exploredStates, expansions)
                     
+        noPath = np.empty((0, 2), dtype=np.int32) if self.pathArray else []
+        
+        # stopped early, report the reached cell closest to the goal
+        if(reason not in ('goal', 'unreachable')):
+            bestPath = self.Backtrack(bestIndex)
+            yield (batch, SearchResult(exploredStates, noPath, float('inf'), reason, expansions, self.Cell(bestIndex), bestPath, self.PathCost(bestPath)))
+            return
+        
         # return if no optimal path
-        if(self.distance[self.goal] == float('inf')):
-            return (exploredStates, [], self.distance[self.goal])
+        if(distance == float('inf')):
+            yield (batch, SearchResult(exploredStates, noPath, distance, reason, expansions))
+            return
         
         # backtrack path
-        backtrackStates = []
-        node = self.goal
-        while(self.path[node] != -1):
-            backtrackStates.append(node)
-            node = self.path[node]
-        backtrackStates.append(self.start)
-        backtrackStates = list(reversed(backtrackStates))      
-        return (exploredStates, backtrackStates, self.distance[self.goal])
+        yield (batch, SearchResult(exploredStates, self.Backtrack(goalIndex), distance, reason, expansions))
+    
+    # plan a batch of (start, goal, stepSize) queries, yields (query index, result) in completion order
+    def plan_many(self, queries, workers = None, chunksize = 16):
+        self.Sync()
+        if(workers is None):
+            workers = os.cpu_count() or 1
+        if(workers <= 1):
+            for (index, query) in enumerate(queries):
+                yield (index, self.plan(*query))
+            return
+        
+        # workers map the free cells from a temporary file instead of receiving them per task, so cells changed
+        # by UpdateCells reach them too, or the occupancy grid from the map's cache when the planner uses the
+        # map's own grid and no cell was changed
+        filename = None
+        if(self.map.cache is None or self.obstacles is not self.map.Grid(self.clearance + self.radius) or not np.array_equal(self.free, self.FreeGrid())):
+            (handle, filename) = tempfile.mkstemp(suffix = '.free')
+            os.close(handle)
+        (landmarkCache, landmarkDirectory) = (None, None)
+        try:
+            if(filename is not None):
+                grid = np.memmap(filename, dtype = np.bool_, mode = 'w+', shape = self.free.shape)
+                grid[:] = self.free
+                grid.flush()
+                del grid
+            
+            # landmark tables are built once here and memory-mapped by the workers from the map's cache, or from
+            # a temporary one when the map has none
+            if(self.heuristic == 'landmarks' and self.mode in ('astar', 'arastar')):
+                self.LoadLandmarks()
+                if(self.map.cache is None):
+                    landmarkDirectory = tempfile.mkdtemp(suffix = '.landmarks')
+                landmarkCache = self.map.cache if self.map.cache is not None else MapCache(landmarkDirectory)
+                if(Landmarks.fetch(landmarkCache, self.map, self.landmarks.key, self.landmarkCount) is None):
+                    self.landmarks.store(landmarkCache, self.map, self.landmarkCount)
+            
+            initargs = (filename, self.map, self.clearance, self.radius, self.Options(), landmarkCache)
+            with multiprocessing.Pool(workers, initializer = _init_worker, initargs = initargs) as pool:
+                for item in pool.imap_unordered(_plan_worker, enumerate(queries), chunksize):
+                    yield item
+        finally:
+            if(filename is not None):
+                os.remove(filename)
+            if(landmarkDirectory is not None):
+                shutil.rmtree(landmarkDirectory)
+
+
+# planner of a plan_many worker process
+_workerPlanner = None
+
+
+# attach a worker process to the shared free cells, without a file the map's cache provides the occupancy grid;
+# landmark tables are mapped from landmarkCache when given
+def _init_worker(filename, worldMap, clearance, radius, options, landmarkCache):
+    global _workerPlanner
+    if(filename is None):
+        _workerPlanner = Planner(clearance, radius, worldMap = worldMap, **options)
+    else:
+        free = np.asarray(np.memmap(filename, dtype = np.bool_, mode = 'r', shape = (worldMap.numRows, worldMap.numCols)))
+        _workerPlanner = Planner(clearance, radius, obstacles = ~free, worldMap = worldMap, **options)
+        _workerPlanner.free = free
+    if(landmarkCache is not None):
+        _workerPlanner.landmarks = Landmarks.fetch(landmarkCache, worldMap, map_key(_workerPlanner), _workerPlanner.landmarkCount)
+
+
+# run one plan_many query in a worker process
+def _plan_worker(item):
+    (index, query) = item
+    return (index, _workerPlanner.plan(*query))
+
+
+# frames waiting for the video writer thread
+FRAME_QUEUE = 64
+
+
+# pixels painted between two frames written to a video
+FRAME_STRIDE = 80
+
+
+# paint pixels in order, queueing a frame after the first and then after every FRAME_STRIDE more like a
+# pixel at a time writer would, each batch between two frames is one fancy indexed assignment
+def _paint_frames(image, rows, cols, color, frames):
+    done = 0
+    for last in range(1, len(rows) + 1, FRAME_STRIDE):
+        image[rows[done:last], cols[done:last]] = color
+        frames.put(image.copy())
+        done = last
+    image[rows[done:], cols[done:]] = color
+
+
+# video writer thread, writes queued frames until it gets None
+def _write_frames(out, frames):
+    while(True):
+        frame = frames.get()
+        if(frame is None):
+            return
+        out.write(frame)
+
+
+# video of a planner's search on its free cells: frames are painted in vectorized batches and written by a
+# background thread; explored states may be a list of (row, col), an (N, 2) array in expansion order or a bitmap
+# (painted at once), and headless skips the preview window
+def render_video(planner, explored_states, backtrack_states, path, headless = False):
+    (numRows, numCols) = (planner.numRows, planner.numCols)
+    fourcc = cv2.VideoWriter_fourcc(*'XVID')
+    out = cv2.VideoWriter(str(path), fourcc, 20.0, (numCols, numRows))
+    frames = queue.Queue(maxsize = FRAME_QUEUE)
+    writer = threading.Thread(target = _write_frames, args = (out, frames))
+    writer.daemon = True
+    writer.start()
+    image = np.zeros((numRows, numCols, 3), dtype=np.uint8)
+    
+    # explored cells, a frame after every 80th cell as they were expanded
+    if(isinstance(explored_states, np.ndarray) and explored_states.dtype == np.bool_):
+        (rows, cols) = np.nonzero(explored_states)
+        (rows, cols) = (rows + 1, cols + 1)
+    else:
+        explored = explored_states if isinstance(explored_states, np.ndarray) else np.array([state[:2] for state in explored_states], dtype=np.int64)
+        explored = explored.reshape(-1, explored.shape[-1] if explored.size > 0 else 2)[:, :2]
+        (rows, cols) = (explored[:, 0], explored[:, 1])
+    _paint_frames(image, numRows - rows, cols - 1, (255, 255, 0), frames)
+    
+    # free cells left black, row by row from the bottom of the map
+    unexplored = planner.free.copy()
+    unexplored[rows - 1, cols - 1] = False
+    (rows, cols) = np.nonzero(unexplored)
+    _paint_frames(image, numRows - 1 - rows, cols, (255, 255, 255), frames)
+    
+    # path, a frame per cell
+    for state in backtrack_states:
+        image[numRows - state[0], state[1] - 1] = (0, 0, 255)
+        frames.put(image.copy())
+        if(not headless):
+            cv2.imshow('result', image)
+            cv2.waitKey(5)
+    
+    frames.put(None)
+    writer.join()
+    out.release()
+    if(not headless):
+        cv2.waitKey(0)
+        cv2.destroyAllWindows()
+
+
+# heuristics selectable for the a-star search mode
+HEURISTICS = ('euclidean', 'landmarks')
+
+
+# formats the explored states can be returned in
+RECORDS = ('list', 'none', 'array', 'bitmap')
+
+
+# search modes selectable on a planner
+SEARCH_MODES = {
+    'astar': Planner.search,
+    'jps': jps_search,
+    'bidirectional': bidirectional_search,
+    'arastar': arastar_search,
+    'hpa': hpa_search,
+}
+
+
+# class for AStar, a single query on the shared planner for its footprint
+class AStar(object):
+    # init function
+    def __init__(self, start, goal, clearance, radius, stepSize):
+        self.start = start
+        self.goal = goal
+        self.stepSize = stepSize
+        self.clearance = clearance
+        self.radius = radius
+        self.planner = get_planner(clearance, radius)
+        self.numRows = self.planner.numRows
+        self.numCols = self.planner.numCols
+        self.obstacles = self.planner.obstacles
+    
+    # move is valid 
+    def IsValid(self, currRow, currCol):
+        return self.planner.IsValid(currRow, currCol)
+    
+    # checks for an obstacle
+    def IsObstacle(self, row, col):
+        return self.planner.IsObstacle(row, col)
+    
+    # animate path, see render_video
+    def animate(self, explored_states, backtrack_states, path, headless = False):
+        render_video(self.planner, explored_states, backtrack_states, path, headless)
+    
+    # diagonal heuristic
+    def diagonal_heuristic(self, row, col, weight = 1.0):
+        return weight * max(np.abs(self.goal[0] - row) / self.stepSize, np.abs(self.goal[1] - col) / self.stepSize)
+
+    # euc heuristic
+    def euc_heuristic(self, row, col, weight = 1.0):
+        return weight * np.sqrt((((self.goal[0] - row) / self.stepSize)**2) + (((self.goal[1] - col) / self.stepSize)**2))
+    
+    # a-star algo, optionally bounded by a deadline, a budget of expansions or a cancel token
+    def search(self, deadline = None, maxExpansions = None, cancel = None):
+        return self.planner.plan(self.start, self.goal, self.stepSize, deadline, maxExpansions, cancel)